@@ -1,26 +1,58 @@
 from icecream import ic
 import os
-import json
 import sys
+from collections import namedtuple, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from inspect import isgenerator
 from pathlib import Path
 
-from PySide6.QtWidgets import QHBoxLayout, QLabel, QLineEdit, QDateEdit, QPushButton, QSizePolicy, QVBoxLayout, QFrame, QDialog, QMessageBox, QGridLayout
-from PySide6.QtCore import Qt, QDate
+from PySide6.QtWidgets import QWidget, QHBoxLayout, QLabel, QLineEdit, QDateEdit, QPushButton, QSizePolicy, QVBoxLayout, QFrame, QDialog, QMessageBox, QGridLayout
+from PySide6.QtCore import Qt, QDate, QObject, QTimer, Signal, QCoreApplication
 from PySide6.QtGui import QPixmap
+from shiboken6 import isValid
+
+from MyHelperLibrary.Helpers.RowView import RowView
+from MyHelperLibrary.Helpers.JSONStore import readJSONFile, atomicWriteJSON
+from MyHelperLibrary.Helpers.JSONArrayReader import JSONArrayReader
 
 # ========================================================================================
     
 """ A function factory wrapper that serves to bundle the dependent classes 
     without having to include them in the parameter list every time displayView is called.
     Create the wrapper first: displayView = createDisplayView(viewController, stackedWidget, viewList),
-    then use like a normal method: self.viewController.displayView("theView")"""
-
-def createDisplayView(viewController, stackedWidget, viewList):
+    then use like a normal method: self.viewController.displayView("theView")
+    
+    View cache (opt-in): with cacheSize or maxCost set, views are kept alive in the stacked widget instead of being deleted,
+    and displaying a cached view only raises it with setCurrentWidget. The view a display method adds to the stacked widget is cached
+    under its name, and the least recently displayed views are evicted past cacheSize views or past maxCost total cost.
+        @costFunction: cost of a view, default 1 per view, or the number of widgets it contains if maxCost is set. 
+        @onEvict: called with (viewName, view) before an evicted or invalidated view is deleted.
+    Put 'refresh' in kwargs to rebuild a cached view, or call displayView.invalidate("theView") (or with no name for all views).
+    Calls with args or kwargs always rebuild the view, as the cached view was built for the arguments of an earlier call,
+    and the new view replaces it in the cache. A call with no arguments raises the view built by the last call
+    
+    Prefetch (needs the view cache): displayView.prefetch("theView", loader, *args, **kwargs) builds a view in idle time so the next
+    displayView("theView") only raises it. The loader, if given, runs on a worker thread and its result is passed to the display method
+    as the first argument, followed by args and kwargs. The display method runs from a zero timeout QTimer with the current view kept on top,
+    and a display method that is a generator is run one yield per event loop iteration, so a long build does not block input.
+    Displaying a view whose prefetch has not finished completes it straight away. displayView.shutdown() stops the loader threads,
+    and runs when the application quits """
+
+def createDisplayView(viewController, stackedWidget, viewList, cacheSize: int=0, maxCost: int=None, costFunction=None, onEvict=None):
     
     viewController  = viewController
     stackedWidget   = stackedWidget
     viewList        = viewList
 
+    cacheEnabled    = bool(cacheSize or maxCost)
+    viewCache       = OrderedDict()                 # viewName -> (view, cost), least recently displayed first
+    prefetches      = {}                            # viewName -> state of a view being prefetched
+    worker          = {}                            # the loader thread pool and the signal bridge, made on first prefetch
+
+    if costFunction is None:
+        costFunction = countWidgets if maxCost else (lambda view: 1)
+
 
     """Dynamically calls a method to display a view.    
         @viewToDisplay: The name of the view to display (e.g., 'PreferencesView').
@@ -36,20 +68,303 @@ def createDisplayView(viewController, stackedWidget, viewList):
         # Use getattr to get the appropriate method
         method      = getattr(viewController, methodName, None)
         newWindow   = kwargs.pop('newWindow', False)
+        refresh     = kwargs.pop('refresh', False)
         
         if method and callable(method):
+            if cacheEnabled and not newWindow:
+                # A view displayed with arguments is built for them, so it replaces the cached one instead of reusing it
+                if refresh or args or kwargs:
+                    refresh = True
+                    invalidate(viewToDisplay)
+
+                elif viewToDisplay in prefetches:
+                    finishPrefetch(viewToDisplay)
+
+                if not refresh and showCachedView(viewToDisplay):
+                    return
+
+                displayAndCache(viewToDisplay, method, args, kwargs)
+                return
+
             if not newWindow:
                 clearStackedLayout(viewList, stackedWidget)        # Clear the layout
 
-            method(*args, **kwargs)                                                 # display the view 
+            runDisplayMethod(method, args, kwargs)                                  # display the view 
             # self.menuController.refreshContextMenus()       # refresh the menus for correct context
             
         else:
             ic(f"No method found for display{viewToDisplay}")
+
+    # ---------------
+
+    def showCachedView(viewName) -> bool:
+        """ Raises a cached view. Returns False if it is not cached or has been deleted outside the cache
+        """
+        cached = viewCache.get(viewName)
+        if not cached:
+            return False
+
+        view = cached[0]
+        if not isValid(view) or stackedWidget.indexOf(view) == -1:
+            del viewCache[viewName]
+            return False
+
+        viewCache.move_to_end(viewName)
+        viewList[viewName] = view
+        stackedWidget.setCurrentWidget(view)
+
+        return True
+
+    # ---------------
+
+    def displayAndCache(viewName, method, args, kwargs):
+        """ Runs the display method and caches the view it adds to the stacked widget
+        """
+        before = getStackedViews()
+
+        runDisplayMethod(method, args, kwargs)
+
+        view = findAddedView(before)
+        if view is None:
+            return
+
+        addToCache(viewName, view)
+        stackedWidget.setCurrentWidget(view)
+
+    # ---------------
+
+    def getStackedViews() -> set:
+        return {stackedWidget.widget(i) for i in range(stackedWidget.count())}
+
+    # ---------------
+
+    def findAddedView(before: set):
+        """ The view a display method added to the stacked widget, preferring the one it made current
+        """
+        added = [view for view in getStackedViews() if view not in before]
+        if not added:
+            return None
+
+        return stackedWidget.currentWidget() if stackedWidget.currentWidget() in added else added[-1]
+
+    # ---------------
+
+    def addToCache(viewName, view):
+
+        viewCache[viewName] = (view, costFunction(view))
+        viewList[viewName]  = view
+
+        # Evict least recently displayed views, never the one just added or the one on screen
+        candidates = [name for name, (cachedView, _) in viewCache.items() if name != viewName and cachedView is not stackedWidget.currentWidget()]
+
+        for name in candidates:
+            if not ((cacheSize and len(viewCache) > cacheSize) or (maxCost and sum(cost for _, cost in viewCache.values()) > maxCost)):
+                break
+            evict(name)
+
+    # ---------------
+
+    def evict(viewName):
+
+        view, cost = viewCache.pop(viewName)
+        viewList[viewName] = None
+
+        if not isValid(view):
+            return
+
+        if onEvict:
+            onEvict(viewName, view)
+
+        stackedWidget.removeWidget(view)
+        view.deleteLater()
+
+    # ---------------
+
+    def invalidate(viewName=None):
+        """ Deletes a cached view so the next display builds it again. With no name every cached view is deleted
+        """
+        for name in ([viewName] if viewName else list(viewCache) + list(prefetches)):
+            cancelPrefetch(name)
+
+            if name in viewCache:
+                evict(name)
+
+    # ---------------
+
+    def prefetch(viewName, loader=None, *args, **kwargs):
+        """ Builds a view in idle time and caches it, see the notes above createDisplayView
+        """
+        if not cacheEnabled:
+            raise ValueError("displayView.prefetch needs the view cache, pass cacheSize or maxCost to createDisplayView")
+
+        if viewName in viewCache or viewName in prefetches:
+            return
+
+        method = getattr(viewController, f"display{viewName}", None)
+        if not (method and callable(method)):
+            ic(f"No method found for display{viewName}")
+            return
+
+        state = {"method": method, "args": args, "kwargs": kwargs, "future": None, "steps": None, "before": None}
+        prefetches[viewName] = state
+
+        if loader:
+            if not worker:
+                worker["pool"]   = ThreadPoolExecutor(max_workers=2, thread_name_prefix="prefetch")
+                worker["bridge"] = PrefetchBridge()
+                worker["bridge"].loaded.connect(onLoaded)
+                QCoreApplication.instance().aboutToQuit.connect(shutdown)
+
+            # The bridge lives in the GUI thread, so the signal from the worker thread is delivered there
+            bridge          = worker["bridge"]
+            state["future"] = worker["pool"].submit(loader)
+            state["future"].add_done_callback(lambda future: isValid(bridge) and bridge.loaded.emit(viewName, future))
+
+        else:
+            QTimer.singleShot(0, lambda: stepPrefetch(viewName, state))
+
+    # ---------------
+
+    def onLoaded(viewName, future):
+        """ Continues the prefetch whose loader finished, unless it was cancelled or replaced by a new prefetch of the view since
+        """
+        state = prefetches.get(viewName)
+
+        if state is not None and state["future"] is future and future.done():
+            stepPrefetch(viewName, state)
+
+    # ---------------
+
+    def stepPrefetch(viewName, state):
+        """ Runs one chunk of a prefetch, and schedules the next for the next event loop iteration
+        """
+        # Finished early by displaying the view, or cancelled
+        if prefetches.get(viewName) is not state:
+            return
+
+        if not runPrefetchChunk(viewName, state):
+            QTimer.singleShot(0, lambda: stepPrefetch(viewName, state))
+
+    # ---------------
+
+    def finishPrefetch(viewName):
+
+        state = prefetches.get(viewName)
+
+        while state is not None and prefetches.get(viewName) is state:
+            runPrefetchChunk(viewName, state)
+
+    # ---------------
+
+    def runPrefetchChunk(viewName, state) -> bool:
+        """ Starts the display method or runs it to its next yield, with the current view kept on top. Returns True when done
+        """
+        previous = stackedWidget.currentWidget()
+        finished = True
+        stackedWidget.setUpdatesEnabled(False)
+
+        try:
+            if state["steps"] is None:
+                args = state["args"]
+
+                if state["future"] is not None:
+                    args = (state["future"].result(), *args)
+
+                state["before"] = getStackedViews()
+                steps           = state["method"](*args, **state["kwargs"])
+
+                if isgenerator(steps):
+                    state["steps"]  = steps
+                    finished        = False
+
+            else:
+                finished = next(state["steps"], PREFETCH_DONE) is PREFETCH_DONE
+
+        except Exception as error:
+            ic(f"Prefetch of {viewName} failed: {error}")
+            cancelPrefetch(viewName)
+            return True
+
+        finally:
+            if previous is not None and isValid(previous):
+                stackedWidget.setCurrentWidget(previous)
+            stackedWidget.setUpdatesEnabled(True)
+
+        if finished:
+            del prefetches[viewName]
+
+            view = findAddedView(state["before"])
+            if view is not None:
+                addToCache(viewName, view)
+
+        return finished
+
+    # ---------------
+
+    def cancelPrefetch(viewName):
+        """ Stops a prefetch and deletes anything it added to the stacked widget
+        """
+        state = prefetches.pop(viewName, None)
+        if state is None:
+            return
+
+        if state["steps"] is not None:
+            state["steps"].close()
+
+        if state["before"] is not None:
+            for view in getStackedViews() - state["before"]:
+                stackedWidget.removeWidget(view)
+                view.deleteLater()
+
+    # ---------------
+
+    def shutdown():
+        """ Cancels every prefetch and stops the loader threads. Run when the application quits, a later prefetch starts them again.
+            Loaders that are already running are waited for, as their done callbacks still emit through the bridge
+        """
+        for name in list(prefetches):
+            cancelPrefetch(name)
+
+        if worker:
+            worker["pool"].shutdown(wait=True, cancel_futures=True)
+            worker["bridge"].deleteLater()
+            worker.clear()
+
+    displayViewWrapper.invalidate   = invalidate
+    displayViewWrapper.prefetch     = prefetch
+    displayViewWrapper.shutdown     = shutdown
+    displayViewWrapper.viewCache    = viewCache
     
     return displayViewWrapper
 
 # ========================================================================================
+
+PREFETCH_DONE = object()
+
+def runDisplayMethod(method, args, kwargs):
+    """ Calls a display method, running it to the end if it is a generator, as prefetch runs display methods one yield at a time
+    """
+    steps = method(*args, **kwargs)
+
+    if isgenerator(steps):
+        for _ in steps:
+            pass
+
+# ---------------
+
+class PrefetchBridge(QObject):
+    """ Carries the name of a view whose prefetch loader finished, and the loader's future, from the worker thread to the GUI thread
+    """
+    loaded = Signal(str, object)
+
+# ========================================================================================
+
+def countWidgets(widget) -> int:
+    """ The number of widgets in a widget's tree, including itself. A rough measure of the memory a view holds
+    """
+    return len(widget.findChildren(QWidget)) + 1
+
+# ========================================================================================
     
 """ A function factory wrapper that serves to bundle the dependent classes 
     without having to include them in the parameter list every time displayView is called. """
@@ -142,35 +457,149 @@ def loadImage(fileName: str, width: int, height: int) -> QPixmap:
 def createDictionaryList(rows, cursorDescription) -> list:
     """ Create a dictionary for all the records returned from a model query
     """
-    # -- Create dictionary --
-    columnNames     = [description[0] for description in cursorDescription]
-    resultsDictList = []
-
-    # Zip the column names and results together into a dictionary list
-    for row in rows:
-        if row is None:
-            continue
-        
-        rowDict = {}
-        for columnName, value in zip(columnNames, row):
-            rowDict[columnName] = value
-        resultsDictList.append(rowDict)
+    createRecord = getRecordFactory(cursorDescription, "dict")
 
-    return resultsDictList
+    return [createRecord(row) for row in rows if row is not None]
 
 # ========================================================================================
 
 # Create a dictionary for a single record
 def createSingleRecordDictionary(category, cursorDescription) -> dict:
-    
-    columnNames = [description[0] for description in cursorDescription]
-    rowDict     = {}
 
     if category is not None:
-        for columnName, value in zip(columnNames, category):
-            rowDict[columnName] = value
+        return getRecordFactory(cursorDescription, "dict")(category)
+
+# ========================================================================================
+
+def createColumnarResult(rows, cursorDescription, structured: bool=False):
+    """ Creates a column name -> list of values dictionary for all the records returned from a model query, 
+        transposing the rows in one pass instead of building a dictionary per row.
+        With structured=True a NumPy record array is returned instead (requires numpy), e.g. result["price"].sum()
+    """
+    columnNames = [description[0] for description in cursorDescription]
+    rows        = [row for row in rows if row is not None]
+
+    if structured:
+        import numpy
+
+        if not rows:
+            return numpy.rec.fromarrays([[] for _ in columnNames], names=columnNames)
+
+        return numpy.rec.fromrecords(rows, names=columnNames)
 
-        return rowDict
+    if not rows:
+        return {columnName: [] for columnName in columnNames}
+
+    return {columnName: list(column) for columnName, column in zip(columnNames, zip(*rows))}
+
+# ========================================================================================
+
+def createRowViewList(rows, cursorDescription) -> list:
+    """ Wraps all the records returned from a model query in RowViews. The rows are kept as they are 
+        and share one column index, so lookups by name work without a dictionary per row
+    """
+    createRecord = getRecordFactory(cursorDescription, "rowView")
+
+    return [createRecord(row) for row in rows if row is not None]
+
+# ========================================================================================
+
+def streamRecords(cursor, batchSize: int=1000, rowType: str="dict"):
+    """ Yields the records of an executed query one at a time, fetching them from the cursor batchSize rows at a time,
+        so only one batch is held in memory and the caller can start on the first rows before the query is exhausted.
+        @rowType: "dict" for a dictionary per record (as createDictionaryList), or any other row type of getRecordFactory
+    """
+    if cursor.description is None:
+        return
+
+    createRecord = getRecordFactory(cursor.description, rowType)
+
+    while True:
+        rows = cursor.fetchmany(batchSize)
+        if not rows:
+            break
+
+        for row in rows:
+            if row is not None:
+                yield createRecord(row)
+
+# ========================================================================================
+
+""" Converters from a query row to a record, built once per result shape (the column names of a cursor description) and row type.
+    Each converter is a single call per row, so converting repeated results of the same query skips reading the column names again """
+
+RECORD_FACTORIES        = {}       # (cursorDescription, rowType) -> converter
+RECENT_FACTORIES        = {}       # (id(cursorDescription), rowType) -> (cursorDescription, converter)
+MAX_RECORD_FACTORIES    = 256
+
+def getRecordFactory(cursorDescription, rowType: str="dict"):
+    """ Returns the cached converter for rows of the cursor description.
+        @rowType: "dict" for a dictionary, "namedTuple" for a namedtuple (invalid column names are renamed to _0, _1...),
+        "rowView" for a RowView or "tuple" for the row as a tuple
+    """
+    # The same description object passed again is found without hashing its contents
+    recent = RECENT_FACTORIES.get((id(cursorDescription), rowType))
+    if recent and recent[0] is cursorDescription:
+        return recent[1]
+
+    try:
+        key          = (cursorDescription, rowType)
+        createRecord = RECORD_FACTORIES.get(key)
+
+    except TypeError:
+        # Descriptions that are not hashable are keyed by their column names
+        key          = (tuple(description[0] for description in cursorDescription), rowType)
+        createRecord = RECORD_FACTORIES.get(key)
+
+    if createRecord is None:
+        createRecord = _createRecordFactory(cursorDescription, rowType)
+
+        if len(RECORD_FACTORIES) >= MAX_RECORD_FACTORIES:
+            RECORD_FACTORIES.clear()
+
+        RECORD_FACTORIES[key] = createRecord
+
+    if len(RECENT_FACTORIES) >= MAX_RECORD_FACTORIES:
+        RECENT_FACTORIES.clear()
+
+    RECENT_FACTORIES[(id(cursorDescription), rowType)] = (cursorDescription, createRecord)
+
+    return createRecord
+
+# ========================================================================================
+
+def _createRecordFactory(cursorDescription, rowType: str):
+
+    columnNames = tuple(description[0] for description in cursorDescription)
+
+    if rowType == "dict":
+        createRecord = lambda row: dict(zip(columnNames, row))
+
+    elif rowType == "namedTuple":
+        createRecord = namedtuple("Record", columnNames, rename=True)._make
+
+    elif rowType == "rowView":
+        columnIndex  = {columnName: position for position, columnName in enumerate(columnNames)}
+        createRecord = partial(RowView, columnIndex=columnIndex)
+
+    elif rowType == "tuple":
+        createRecord = tuple
+
+    else:
+        raise ValueError(f"Invalid rowType passed to getRecordFactory. rowType was: {rowType}")
+
+    return createRecord
+
+# ========================================================================================
+
+def createRowFactory(rowType: str="dict"):
+    """ Creates a sqlite3 row_factory returning records of the row type, see getRecordFactory. 
+        Use: connection.row_factory = createRowFactory("dict")
+    """
+    def rowFactory(cursor, row):
+        return getRecordFactory(cursor.description, rowType)(row)
+
+    return rowFactory
 
 # ========================================================================================
 
@@ -216,7 +645,12 @@ def addWidgets(layout, widgetList: list):
 
 # ========================================================================================
 
-def clearLayout(layout):
+def clearLayout(layout, factory=None):
+    """ Deletes the widgets of a layout, or releases them to a WidgetFactory's pools to be reused if a factory is given
+    """
+    if factory:
+        factory.releaseLayout(layout)
+        return
 
     while layout.count():
         item = layout.takeAt(0)
@@ -225,15 +659,21 @@ def clearLayout(layout):
 
 # ========================================================================================
 
-def clearStackedLayout(viewList, stackedWidget):
-
+def clearStackedLayout(viewList, stackedWidget, factory=None):
+    """ Deletes every view of the stacked widget. If a WidgetFactory is given, the widgets of views that are
+        layout frames are released to its pools to be reused instead
+    """
     for key in viewList.keys():
         viewList[key] = None
 
     while stackedWidget.count():
         widget = stackedWidget.widget(0)
         stackedWidget.removeWidget(widget)
-        widget.deleteLater()      
+
+        if factory:
+            factory.release(widget)
+        else:
+            widget.deleteLater()      
                 
 # ========================================================================================
 
@@ -449,8 +889,10 @@ def keyCheck(value):
     
 # ========================================================================================
 
+SIZE_POLICY_MAP = {"fixed" : QSizePolicy.Fixed, "expanding" : QSizePolicy.Expanding}
+
 def getSizePolicyMap(sizePolicy: tuple[str,str]|None) -> QSizePolicy:
-    policyMap = {"fixed" : QSizePolicy.Fixed, "expanding" : QSizePolicy.Expanding}
+    policyMap = SIZE_POLICY_MAP
     
     if not sizePolicy:
         return QSizePolicy(QSizePolicy.Preferred, QSizePolicy.Preferred)
@@ -475,24 +917,35 @@ def getAlignMap(alignment: str):
 
 # ========================================================================================
 
-def readJSONData(filePath):
-    data = []
-    if os.path.exists(filePath):
-        with open(filePath, 'r') as file:
-            try:
-                return json.load(file)
-            except json.JSONDecodeError:
-                return data  # Start with an empty list if the file is empty or invalid
-    else:
-        return data  # Create a new list if the file does not exist
+def readJSONData(filePath, serializer="json"):
+    """ Reads a JSON file. Returns an empty list if the file does not exist, is empty or is invalid.
+        Every call returns its own copy of the data. See JSONStore for incremental updates.
+        @serializer: the name of a serializer from Serializers. The json module by default, "auto" for the fastest JSON library installed
+                     or "msgpack" for binary files
+    """
+    data = readJSONFile(filePath, serializer=serializer)
+
+    return [] if data is None else data
 
 # ========================================================================================
 
-def writeJSONData(filePath, data):
-    
-    # Write the json file
-    with open(filePath, 'w') as file:
-        json.dump(data, file, indent=4)
+def streamJSONData(filePath):
+    """ Yields the elements of a JSON array file one at a time, for callers of readJSONData that only iterate the data.
+        Only a window of the file is held in memory, see JSONArrayReader. Yields nothing if the file does not exist
+    """
+    if not os.path.exists(filePath):
+        return
+
+    with JSONArrayReader(filePath) as reader:
+        yield from reader
+
+# ========================================================================================
+
+def writeJSONData(filePath, data, serializer="json", compact: bool=False):
+    """ Writes the json file atomically, through a temporary file that replaces it.
+        Indented unless compact. See readJSONData for the serializer
+    """
+    atomicWriteJSON(filePath, data, compact, serializer)
         
 # ========================================================================================
 
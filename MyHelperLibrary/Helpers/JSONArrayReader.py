@@ -0,0 +1,229 @@
+import os
+import json
+import mmap
+import struct
+from array import array
+
+
+
+class JSONArrayReader():
+    """ Reads the elements of a file holding one top level JSON array one at a time, without loading the whole file.
+        The file is memory mapped and parsed a window at a time: each window is decoded as latin-1, so character positions
+        are byte offsets, and elements are found with json's raw_decode. Elements containing non ASCII bytes are parsed
+        again from their UTF-8 bytes. A window grows when an element does not fit in it.
+
+        Iterate it for the elements in order, or index it (reader[n], len(reader)) to seek to an element through an offset index.
+        The index is built by one pass over the file on first use and, if persistIndex, saved next to the file (<file>.idx)
+        with the size and mtime of the file, so it is reused until the file changes. Use as a context manager or call close()
+    """
+
+    INDEX_HEADER = struct.Struct("<QQ")                 # file size, file mtime in ns
+
+    def __init__(self, filePath, windowSize: int=1 << 20, persistIndex: bool=True):
+
+        self.filePath       = os.fspath(filePath)
+        self.indexPath      = f"{self.filePath}.idx"
+        self.windowSize     = windowSize
+        self.persistIndex   = persistIndex
+
+        self._decoder       = json.JSONDecoder()
+        self._offsets       = None
+
+        self._file          = open(self.filePath, "rb")
+        self._size          = os.fstat(self._file.fileno()).st_size
+
+        # An empty file can't be mapped
+        self._map           = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self._size else b""
+
+    # ========================================================================================
+
+    def __enter__(self):
+        return self
+
+    # ---------------
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------------
+
+    def close(self):
+
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+
+        self._file.close()
+
+    # ========================================================================================
+
+    def __iter__(self):
+        for start, element in self._scan():
+            yield element
+
+    # ---------------
+
+    def __len__(self):
+        return len(self._getOffsets())
+
+    # ---------------
+
+    def __getitem__(self, number: int):
+
+        offsets = self._getOffsets()
+
+        if number < 0:
+            number += len(offsets)
+
+        if not 0 <= number < len(offsets):
+            raise IndexError(f"JSONArrayReader element out of range: {number}")
+
+        start   = offsets[number]
+        text    = self._readWindow(start, self.windowSize)
+
+        return self._decodeAt(text, start, 0)[3]
+
+    # ========================================================================================
+
+    def _scan(self):
+        """ Yields (offset, element) for every element of the array
+        """
+        text, base, position = self._nextToken(self._readWindow(0, self.windowSize), 0, 0)
+
+        if base + position >= self._size:
+            return
+
+        if text[position] != "[":
+            raise ValueError(f"{self.filePath} does not hold a JSON array")
+
+        text, base, position = self._nextToken(text, base, position + 1)
+
+        if text[position:position + 1] == "]":
+            return
+
+        while True:
+            # Move the window up to the element when less than half of it remains, so windows are reused for many elements
+            if position > len(text) // 2 and base + len(text) < self._size:
+                base, text, position = base + position, self._readWindow(base + position, self.windowSize), 0
+
+            text, base, position, element, separator = self._decodeAt(text, base, position)
+            yield base + position, element
+
+            # The separator after the element is a comma before the next element, or the closing bracket
+            if text[separator] == "]":
+                return
+
+            text, base, position = self._nextToken(text, base, separator + 1)
+
+    # ========================================================================================
+
+    def _decodeAt(self, text: str, base: int, position: int):
+        """ Decodes the element at the position of the window, widening the window until the element and the separator after it fit.
+            Returns (text, base, position, element, separatorPosition), with the window moved to start at the element if it was widened
+        """
+        windowSize = self.windowSize
+
+        while True:
+            atEnd       = base + len(text) >= self._size
+            position    = self._skipWhitespace(text, position)
+
+            try:
+                element, end    = self._decoder.raw_decode(text, position)
+                separator       = self._skipWhitespace(text, end)
+
+                # A separator inside the window shows the element was not cut short, e.g. a number split at the window end
+                if separator < len(text) and text[separator] in ",]":
+                    break
+
+                if atEnd:
+                    raise ValueError(f"{self.filePath} is not a valid JSON array: expected ',' or ']' at byte {base + separator}")
+
+            except json.JSONDecodeError as error:
+                if atEnd:
+                    raise ValueError(f"{self.filePath} is not a valid JSON array: {error.msg} at byte {base + error.pos}") from error
+
+            windowSize              *= 2
+            base, text, position    = base + position, self._readWindow(base + position, windowSize), 0
+
+        # latin-1 turns each byte into one character, so non ASCII text is parsed again from its UTF-8 bytes
+        if not text[position:end].isascii():
+            element = json.loads(self._map[base + position:base + end])
+
+        return text, base, position, element, separator
+
+    # ========================================================================================
+
+    def _readWindow(self, start: int, size: int) -> str:
+        return self._map[start:start + size].decode("latin-1")
+
+    # ---------------
+
+    def _skipWhitespace(self, text: str, position: int) -> int:
+
+        while position < len(text) and text[position] in " \t\r\n":
+            position += 1
+
+        return position
+
+    # ---------------
+
+    def _nextToken(self, text: str, base: int, position: int):
+        """ Skips whitespace, moving the window on if the whitespace runs past it. Returns (text, base, position)
+        """
+        while True:
+            position = self._skipWhitespace(text, position)
+
+            if position < len(text) or base + len(text) >= self._size:
+                return text, base, position
+
+            base, text, position = base + position, self._readWindow(base + position, self.windowSize), 0
+
+    # ========================================================================================
+
+    def _getOffsets(self) -> array:
+        """ The byte offset of every element, read from the index file if it matches the file, or built by scanning the file
+        """
+        if self._offsets is not None:
+            return self._offsets
+
+        stat        = os.fstat(self._file.fileno())
+        signature   = (stat.st_size, stat.st_mtime_ns)
+
+        self._offsets = self._readIndex(signature)
+
+        if self._offsets is None:
+            self._offsets = array("Q", (start for start, element in self._scan()))
+
+            if self.persistIndex:
+                self._writeIndex(signature)
+
+        return self._offsets
+
+    # ---------------
+
+    def _readIndex(self, signature: tuple):
+
+        try:
+            with open(self.indexPath, "rb") as indexFile:
+                header = indexFile.read(self.INDEX_HEADER.size)
+
+                if len(header) != self.INDEX_HEADER.size or self.INDEX_HEADER.unpack(header) != signature:
+                    return None
+
+                offsets = array("Q")
+                offsets.frombytes(indexFile.read())
+                return offsets
+
+        except (FileNotFoundError, ValueError):
+            return None
+
+    # ---------------
+
+    def _writeIndex(self, signature: tuple):
+
+        tmpPath = f"{self.indexPath}.part"
+
+        with open(tmpPath, "wb") as indexFile:
+            indexFile.write(self.INDEX_HEADER.pack(*signature))
+            indexFile.write(self._offsets.tobytes())
+
+        os.replace(tmpPath, self.indexPath)
@@ -0,0 +1,309 @@
+import os
+import json
+import stat
+import tempfile
+import threading
+from pathlib import Path
+
+from MyHelperLibrary.Helpers.Serializers import getSerializer
+
+
+
+# The umask can only be read by setting it, which changes it for every thread in the process, so it is read once at import
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+# ========================================================================================
+
+""" Parsed JSON files keyed by path, with the (mtime, size, inode) of the file when it was parsed.
+    A file that has not changed since is returned from here without being read again """
+
+JSON_FILE_CACHE = {}
+
+def getFileSignature(filePath):
+    """ (mtime, size, inode) of the file, or None if it does not exist. An atomic save always gives the file a new inode
+    """
+    try:
+        fileStat = os.stat(filePath)
+    except FileNotFoundError:
+        return None
+
+    return (fileStat.st_mtime_ns, fileStat.st_size, fileStat.st_ino)
+
+# ========================================================================================
+
+def readJSONFile(filePath, default=None, serializer="json", shared: bool=False):
+    """ Parses a JSON (or MessagePack, with serializer="msgpack") file. Each call returns newly parsed data unless shared.
+        With shared, the data is kept in JSON_FILE_CACHE and returned from there while the file is unchanged, without reading it again.
+        Shared data is the same object for every shared read of the file, so it must not be changed.
+        Returns default if the file does not exist, is empty or can't be decoded
+    """
+    filePath    = os.path.abspath(filePath)
+    serializer  = getSerializer(serializer)
+    signature   = getFileSignature(filePath)
+
+    if signature is None:
+        JSON_FILE_CACHE.pop(filePath, None)
+        return default
+
+    cached = JSON_FILE_CACHE.get(filePath) if shared else None
+    if cached and cached[0] == signature and cached[1] == serializer.name:
+        return cached[2]
+
+    with open(filePath, "rb") as file:
+        raw = file.read()
+
+    try:
+        data = serializer.loads(raw)
+
+    except serializer.decodeErrors:
+        # The faster libraries reject some of what the json module writes, such as NaN
+        try:
+            if serializer.binary or serializer.name == "json":
+                raise ValueError
+            data = json.loads(raw)
+
+        except ValueError:
+            JSON_FILE_CACHE.pop(filePath, None)
+            return default
+
+    if shared:
+        JSON_FILE_CACHE[filePath] = (signature, serializer.name, data)
+
+    return data
+
+# ========================================================================================
+
+def atomicWriteBytes(filePath, content: bytes):
+    """ Writes the content to a temporary file in the same directory and renames it over the file,
+        so the file holds either the old or the new contents even if the program stops part way through
+    """
+    filePath            = os.path.abspath(filePath)
+    directory, name     = os.path.split(filePath)
+    descriptor, tmpPath = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=directory)
+
+    try:
+        # mkstemp makes the file readable by the owner only, so it gets the mode of the file it replaces, or the umask default
+        os.chmod(tmpPath, getFileMode(filePath))
+
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(content)
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(tmpPath, filePath)
+
+    except BaseException:
+        try:
+            os.remove(tmpPath)
+        except OSError:
+            pass
+        raise
+
+    JSON_FILE_CACHE.pop(filePath, None)
+
+# ---------------
+
+def getFileMode(filePath) -> int:
+    """ The permission bits of the file, or those a new file gets under the umask if it does not exist
+    """
+    try:
+        return stat.S_IMODE(os.stat(filePath).st_mode)
+
+    except FileNotFoundError:
+        return 0o666 & ~UMASK
+
+# ========================================================================================
+
+def atomicWriteText(filePath, text: str):
+    atomicWriteBytes(filePath, text.encode("utf-8"))
+
+# ========================================================================================
+
+def atomicWriteJSON(filePath, data, compact: bool=False, serializer="json"):
+    """ Serialises the data first, indented unless compact, then saves it with atomicWriteBytes
+    """
+    atomicWriteBytes(filePath, getSerializer(serializer).dumps(data, compact))
+
+# ========================================================================================
+
+class JSONStore():
+    """ JSON file that is updated incrementally. set, delete and append apply the change in memory
+        and add it as one line to a journal file next to the JSON file (<file>.journal), instead of rewriting the whole file.
+        Every compactEvery changes, or on compact(), the data is saved to the JSON file atomically and the journal is removed.
+        Loading reads the JSON file and replays the journal, and is skipped while neither file has changed since the last load.
+        A journal line cut short by a crash is dropped. Meant for one writing process per file.
+        The JSON file is written indented unless compact, with a JSON serializer from Serializers
+    """
+
+    def __init__(self, filePath, compactEvery: int=100, compact: bool=False, serializer="json", default=None):
+
+        if getSerializer(serializer).binary:
+            raise ValueError(f"JSONStore needs a JSON serializer, the journal is one JSON document per line. Serializer was: {serializer}")
+
+        self.filePath       = Path(filePath)
+        self.journalPath    = self.filePath.with_name(f"{self.filePath.name}.journal")
+        self.compactEvery   = compactEvery
+        self.compactFormat  = compact
+        self.serializer     = getSerializer(serializer)
+        self.default        = {} if default is None else default
+
+        self._data          = None
+        self._signature     = None
+        self._journalCount  = 0
+        self._lock          = threading.RLock()
+
+    # ========================================================================================
+
+    @property
+    def data(self):
+        """ The current data. Change it through set, delete, append or save so the change is stored
+        """
+        return self.load()
+
+    # ========================================================================================
+
+    def load(self):
+        """ Reads the JSON file and replays the journal, unless neither has changed since the last load
+        """
+        with self._lock:
+            signature = self._getSignature()
+            if self._data is not None and signature == self._signature:
+                return self._data
+
+            self._data          = self._readBase()
+            self._journalCount  = 0
+            torn                = False
+
+            if os.path.exists(self.journalPath):
+                with open(self.journalPath, "rb") as journal:
+                    for line in journal:
+                        try:
+                            operation = self.serializer.loads(line)
+                        except self.serializer.decodeErrors:
+                            torn = True
+                            break
+
+                        self._data = applyOperation(self._data, operation)
+                        self._journalCount += 1
+
+            self._signature = signature
+
+            # New lines can't be appended after a cut off line, so the journal is folded into the file
+            if torn:
+                self.compact()
+
+            return self._data
+
+    # ========================================================================================
+
+    def get(self, key, default=None):
+        return self.load().get(key, default)
+
+    # ========================================================================================
+
+    def set(self, key, value):
+        self._record({"op": "set", "key": key, "value": value})
+
+    # ========================================================================================
+
+    def delete(self, key):
+        self._record({"op": "delete", "key": key})
+
+    # ========================================================================================
+
+    def append(self, value, key=None):
+        """ Appends the value to the list stored at the key, or to the data itself if it is a list and no key is given
+        """
+        operation = {"op": "append", "value": value}
+        if key is not None:
+            operation["key"] = key
+
+        self._record(operation)
+
+    # ========================================================================================
+
+    def save(self, data):
+        """ Replaces all of the data, saving it atomically
+        """
+        with self._lock:
+            self._data = data
+            self.compact()
+
+    # ========================================================================================
+
+    def compact(self):
+        """ Saves the data to the JSON file atomically and removes the journal
+        """
+        with self._lock:
+            data = self.load() if self._data is None else self._data
+
+            atomicWriteJSON(self.filePath, data, self.compactFormat, self.serializer)
+
+            try:
+                os.remove(self.journalPath)
+            except FileNotFoundError:
+                pass
+
+            self._journalCount  = 0
+            self._signature     = self._getSignature()
+
+    # ========================================================================================
+
+    def _record(self, operation: dict):
+
+        with self._lock:
+            self._data = applyOperation(self.load(), operation)
+
+            with open(self.journalPath, "ab") as journal:
+                journal.write(self.serializer.dumps(operation, compact=True) + b"\n")
+
+            self._journalCount += 1
+
+            if self._journalCount >= self.compactEvery:
+                self.compact()
+            else:
+                self._signature = self._getSignature()
+
+    # ========================================================================================
+
+    def _readBase(self):
+
+        try:
+            with open(self.filePath, "rb") as file:
+                return self.serializer.loads(file.read())
+
+        except FileNotFoundError:
+            return json.loads(json.dumps(self.default))
+
+        except self.serializer.decodeErrors as error:
+            raise ValueError(f"JSONStore file is not valid JSON: {self.filePath}. {error}") from error
+
+    # ========================================================================================
+
+    def _getSignature(self):
+        return (getFileSignature(self.filePath), getFileSignature(self.journalPath))
+
+# ========================================================================================
+
+def applyOperation(data, operation: dict):
+    """ Applies one journal operation to the data and returns the data
+    """
+    kind = operation["op"]
+
+    if kind == "set":
+        data[operation["key"]] = operation["value"]
+
+    elif kind == "delete":
+        data.pop(operation["key"], None)
+
+    elif kind == "append":
+        if "key" in operation:
+            data.setdefault(operation["key"], []).append(operation["value"])
+        else:
+            data.append(operation["value"])
+
+    else:
+        raise ValueError(f"Unknown JSONStore journal operation: {kind}")
+
+    return data
@@ -1,9 +1,7 @@
 from enum import Enum, auto
-from icecream import ic
 
-from PySide6.QtWidgets import QWidget, QGridLayout
-from PySide6.QtCore import Qt, QEvent, QTimer, Signal
-from PySide6.QtGui import QCursor
+from PySide6.QtWidgets import QWidget, QGridLayout, QRubberBand
+from PySide6.QtCore import Qt, QEvent, QPoint, QRect, QTimer, Signal
 
 # =============================================================================================
 
@@ -25,7 +23,8 @@ class ResizeableGrid(QWidget):
     # Define a signal to communicate resize constraints
     stopResizeSignal = Signal(str)  # Signal will carry the direction ("vertical" or "horizontal")
 
-    def __init__(self, dividers, direction = Direction.HORIZONTAL, minWidth = 75, minHeight = 75, customWindowParent=None):
+    def __init__(self, dividers, direction = Direction.HORIZONTAL, minWidth = 75, minHeight = 75, customWindowParent=None, rubberBandPreview=False,
+                 gridId: str=None, layoutStore=None):
         super().__init__()
         
         # Create a grid layout
@@ -49,10 +48,34 @@ class ResizeableGrid(QWidget):
         self.startHeight        = 0
 
 
-        # Timer to continuously check the mouse position and update cursor
-        self.mouseTrackingTimer = QTimer(self)
-        self.mouseTrackingTimer.timeout.connect(self.trackMousePosition)
-        self.mouseTrackingTimer.start(300)  # Every 30 ms
+        # Hover events arrive for every mouse move over the grid and its frames, so the cursor is updated as the mouse moves
+        # instead of polling. The divider hit rectangles are cached until the grid is resized or laid out again
+        self.dividerRects       = None                  # [(QRect, frame1, frame2)] in grid coordinates, None when out of date
+        self.setAttribute(Qt.WA_Hover)
+
+        self.cellIndex          = None                  # widget -> (row, column, rowSpan, columnSpan), None when out of date
+        self.rowWidgets         = {}                    # row number -> widgets in the row, by column
+        self.columnWidgets      = {}                    # column number -> widgets in the column, by row
+        self.indexedCount       = 0                     # grid.count() when the index was last brought up to date
+
+        # Divider drags and window resizes are coalesced into at most one update per display frame. With rubberBandPreview
+        # a line shows where the divider will go during the drag, and the frames are only resized when it is released
+        self.rubberBandPreview  = rubberBandPreview
+        self.rubberBand         = None                  # made on the first preview
+        self.pendingDragPos     = None                  # latest global mouse position of the drag, not yet applied
+        self.dragSizes          = None                  # last valid (size, adjacent size) of the drag
+        self.pendingWindowResize = False
+
+        self.resizeTimer        = QTimer(self)
+        self.resizeTimer.setSingleShot(True)
+        self.resizeTimer.setInterval(16)                # one frame at 60 Hz
+        self.resizeTimer.timeout.connect(self.applyPendingResize)
+
+        # With a gridId and a JSONStore, the column (or row) proportions are saved under the gridId after each divider drag,
+        # and the stored proportions are applied on the first resize, which Qt sends before the grid is first shown
+        self.gridId             = gridId
+        self.layoutStore        = layoutStore
+        self.layoutApplied      = False
 
         # Connect stop resizing signal to CustomWindow
         if customWindowParent:
@@ -69,53 +92,74 @@ class ResizeableGrid(QWidget):
 
     # ========================================================================================    
 
-    def trackMousePosition(self):
-        pos             = QCursor.pos()
-        foundDivider    = False
-
+    def trackMousePosition(self, pos: QPoint):
+        """ Updates the cursor and the divider under the mouse. pos is in grid coordinates
+        """
         if self.resizing:
             return
 
-        # Loop through every tuple in the divider list
-        for frame1, frame2 in self.dividers:
+        if self.dividerRects is None:
+            self.dividerRects = self.getDividerRects()
 
-            # convert local coordinates to global coordinates
-            frame1Rect = frame1.mapToGlobal(frame1.rect().topLeft())        
-            frame2Rect = frame2.mapToGlobal(frame2.rect().topLeft())
+        for rect, frame1, frame2 in self.dividerRects:
+            if rect.contains(pos):
 
-            if self.direction == Direction.HORIZONTAL:
+                if not self.isOverDivider:
+                    self.setCursor(Qt.SplitHCursor if self.direction == Direction.HORIZONTAL else Qt.SplitVCursor)
 
-                # frameRect.x() gives the leftedge, so to get the right edge add the width
-                # the cursor is greater than right edge of frame 1 and less than the left edge of frame 2 
-                if frame1Rect.x() + frame1.geometry().width() <= pos.x() <= frame2Rect.x():          
+                self.isOverDivider  = True
+                self.resizingFrames = (frame1, frame2)          # load the frames involved in the split
+                return
 
-                    self.setCursor(Qt.SplitHCursor)
-                    self.isOverDivider  = True
-                    self.resizingFrames = (frame1, frame2)          # load the frames involved in the split
-                    foundDivider        = True
-                    break
+        if self.isOverDivider:
+            self.unsetCursor()
+            self.isOverDivider = False
 
+    # ========================================================================================   
 
-            elif self.direction == Direction.VERTICAL:
-                if frame1Rect.y() + frame1.geometry().height() <= pos.y() <= frame2Rect.y():
+    def getDividerRects(self) -> list:
+        """ The gap between each pair of divider frames, spanning the grid: from the right edge of frame 1 to the left edge
+            of frame 2 for horizontal grids, or from the bottom of frame 1 to the top of frame 2 for vertical grids
+        """
+        rects = []
 
-                    self.setCursor(Qt.SplitVCursor)
-                    self.isOverDivider  = True
-                    self.resizingFrames = (frame1, frame2)          # load the frames involved in the split
-                    foundDivider        = True
-                    break
+        for frame1, frame2 in self.dividers:
+            first   = frame1.geometry()
+            second  = frame2.geometry()
 
+            if self.direction == Direction.HORIZONTAL:
+                rect = QRect(QPoint(first.x() + first.width(), 0), QPoint(second.x(), self.height()))
+            else:
+                rect = QRect(QPoint(0, first.y() + first.height()), QPoint(self.width(), second.y()))
 
-        if not foundDivider:
-            self.setCursor(Qt.ArrowCursor) 
-            self.isOverDivider = False
+            rects.append((rect, frame1, frame2))
+
+        return rects
 
 
     # ========================================================================================   
 
     def eventFilter(self, obj, event):
 
-        if event.type() == QEvent.MouseButtonPress:
+        eventType = event.type()
+
+        if eventType == QEvent.HoverMove:
+            self.trackMousePosition(event.position().toPoint())
+
+        elif eventType == QEvent.HoverLeave:
+            if self.isOverDivider and not self.resizing:
+                self.unsetCursor()
+                self.isOverDivider = False
+
+        # Not for the cell index: a layout request is posted after every setFixedWidth on a frame, so every resize frame
+        elif eventType == QEvent.LayoutRequest:
+            self.dividerRects = None
+
+        # Widgets added to or removed from self.grid directly leave the cell index out of date
+        elif eventType in (QEvent.ChildAdded, QEvent.ChildRemoved):
+            self.cellIndex = None
+
+        elif eventType == QEvent.MouseButtonPress:
             
             self.MousePressHandler(event)
             return True 
@@ -126,14 +170,16 @@ class ResizeableGrid(QWidget):
     # ========================================================================================   
 
     def MousePressHandler(self, event):
-        ic("mouse press")
 
         if self.isOverDivider:
 
-            self.resizing = True
+            self.resizing       = True
+            self.pendingDragPos = None
+            self.dragSizes      = None
+            startPos            = event.globalPosition().toPoint()
 
             if self.direction == Direction.HORIZONTAL:
-                self.startX             = event.globalX()
+                self.startX             = startPos.x()
                 self.startWidth         = self.resizingFrames[0].width()
 
                 firstColNumber          = self.getColumnNumber(self.resizingFrames[0])
@@ -147,7 +193,7 @@ class ResizeableGrid(QWidget):
 
 
             elif self.direction == Direction.VERTICAL:
-                self.startY             = event.globalY()
+                self.startY             = startPos.y()
                 self.startHeight        = self.resizingFrames[0].height()
 
                 firstRowNumber          = self.getRowNumber(self.resizingFrames[0])
@@ -162,122 +208,319 @@ class ResizeableGrid(QWidget):
     # ========================================================================================   
 
     def mouseMoveEvent(self, event):
-        ic("mouse move")
+
         if self.resizing:
 
-            if self.direction == Direction.HORIZONTAL:
-                
-                delta = event.globalX() - self.startX
+            # Only the latest position is kept, the timer applies it once per frame however many moves arrive
+            self.pendingDragPos = event.globalPosition().toPoint()
+            self.scheduleResize()
 
-                newWidth         = max(self.minWidth, self.startWidth + delta)    # Get distance mouse has moved from start position                  
-                newAdjacentWidth = max(self.minWidth, self.combinedWidth - newWidth)
+    # ========================================================================================   
 
-                if newWidth > self.minWidth and (newAdjacentWidth > self.minWidth or newWidth < self.startWidth):
+    def mouseReleaseEvent(self, event):
 
-                    for widget in self.activeColWidgets:
-                        widget.setFixedWidth(newWidth)
+        if event.button() == Qt.LeftButton:
 
-                    for widget in self.adjacentColWidgets:
-                        widget.setFixedWidth(newAdjacentWidth)
+            # The final geometry is applied now rather than on the next frame. A release past the minimum keeps the last valid sizes
+            if self.resizing and self.pendingDragPos is not None:
+                sizes = self.getDragSizes(self.pendingDragPos) or self.dragSizes
 
+                if sizes is not None:
+                    self.applyDragSizes(sizes)
 
-            # --------------------------------------------------------------------------------------------------------
+            if self.rubberBand is not None:
+                self.rubberBand.hide()
 
-            elif self.direction == Direction.VERTICAL:
+            if self.resizing:
+                self.saveLayout()
 
-                delta                   = event.globalY() - self.startY
+            self.resizing       = False
+            self.resizingFrames = (None, None)
+            self.pendingDragPos = None
 
-                newHeight               = max(self.minHeight, self.startHeight + delta) 
-                newAdjacentHeight       = max(self.minHeight, self.combinedHeight - newHeight) 
 
-                if newHeight > self.minHeight and (newAdjacentHeight > self.minHeight or newHeight < self.startHeight):
+    # ========================================================================================   
 
-                    for widget in self.activeRowWidgets:
-                        widget.setFixedHeight(newHeight)
+    def scheduleResize(self):
+        """ Starts the frame timer unless an update is already due, so sizes are set at most once per frame
+        """
+        if not self.resizeTimer.isActive():
+            self.resizeTimer.start()
 
-                    for widget in self.adjacentRowWidgets:
-                        widget.setFixedHeight(newAdjacentHeight)
+    # ---------------
 
+    def applyPendingResize(self):
+        """ Runs once per frame while there are changes: the latest divider drag position and any window resize
+        """
+        if self.pendingWindowResize:
+            self.pendingWindowResize = False
+            self.adjustToWindowSize()
 
-    # ========================================================================================   
+        if self.resizing and self.pendingDragPos is not None:
+            sizes = self.getDragSizes(self.pendingDragPos)
 
-    def mouseReleaseEvent(self, event):
-        ic("mouse release")
-        if event.button() == Qt.LeftButton:
-                
-            self.resizing       = False
-            self.resizingFrames = (None, None)
+            if sizes is not None:
+                self.dragSizes = sizes
+
+                if self.rubberBandPreview:
+                    self.showDividerPreview(sizes)
+                else:
+                    self.applyDragSizes(sizes)
+
+    # ---------------
+
+    def getDragSizes(self, globalPos: QPoint):
+        """ The new sizes of the dragged frame and the adjacent frame for the mouse position, or None if the drag would take
+            either past the minimum
+        """
+        if self.direction == Direction.HORIZONTAL:
+            start, startSize, combined, minimum = self.startX, self.startWidth, self.combinedWidth, self.minWidth
+            delta = globalPos.x() - start
+        else:
+            start, startSize, combined, minimum = self.startY, self.startHeight, self.combinedHeight, self.minHeight
+            delta = globalPos.y() - start
+
+        newSize         = max(minimum, startSize + delta)           # Get distance mouse has moved from start position
+        newAdjacentSize = max(minimum, combined - newSize)
+
+        if newSize > minimum and (newAdjacentSize > minimum or newSize < startSize):
+            return newSize, newAdjacentSize
+
+        return None
+
+    # ---------------
+
+    def applyDragSizes(self, sizes: tuple):
 
+        newSize, newAdjacentSize = sizes
+
+        if self.direction == Direction.HORIZONTAL:
+            for widget in self.activeColWidgets:
+                widget.setFixedWidth(newSize)
+
+            for widget in self.adjacentColWidgets:
+                widget.setFixedWidth(newAdjacentSize)
+
+        elif self.direction == Direction.VERTICAL:
+            for widget in self.activeRowWidgets:
+                widget.setFixedHeight(newSize)
+
+            for widget in self.adjacentRowWidgets:
+                widget.setFixedHeight(newAdjacentSize)
+
+    # ---------------
+
+    def showDividerPreview(self, sizes: tuple):
+        """ Draws a line where the divider would go, leaving the frames as they are until the mouse is released
+        """
+        if self.rubberBand is None:
+            self.rubberBand = QRubberBand(QRubberBand.Line, self)
+
+        first = self.resizingFrames[0].geometry()
+
+        if self.direction == Direction.HORIZONTAL:
+            thickness = max(2, self.grid.horizontalSpacing())
+            self.rubberBand.setGeometry(first.x() + sizes[0], 0, thickness, self.height())
+        else:
+            thickness = max(2, self.grid.verticalSpacing())
+            self.rubberBand.setGeometry(0, first.y() + sizes[0], self.width(), thickness)
+
+        self.rubberBand.show()
 
     # ========================================================================================   
     
 
+    # The cell index: the (row, column) of each widget and the widgets of each row and column, so lookups don't scan the grid.
+    # Kept up to date by addWidget and removeWidget. Widgets added to or removed from self.grid directly are caught by the item count
+    # and the child added and removed events, and the index is rebuilt on the next lookup.
+    # Moving a widget to another cell, or replacing one, has to go through removeWidget and addWidget: done on self.grid directly
+    # it changes neither the count nor the children, so the index would not see it
+
+    def addWidget(self, widget, row: int, column: int, rowSpan: int=1, columnSpan: int=1, alignment=Qt.AlignmentFlag(0)):
+
+        self.grid.addWidget(widget, row, column, rowSpan, columnSpan, alignment)
+
+        if self.cellIndex is not None and self.grid.count() == self.indexedCount + 1:
+            self.indexWidget(widget, row, column, rowSpan, columnSpan)
+            self.indexedCount += 1
+        else:
+            self.cellIndex = None
+
+    # ---------------
+
+    def removeWidget(self, widget):
+
+        self.grid.removeWidget(widget)
+
+        if self.cellIndex is not None and widget in self.cellIndex and self.grid.count() == self.indexedCount - 1:
+            row, column, rowSpan, columnSpan = self.cellIndex.pop(widget)
+
+            for rowNum in range(row, row + rowSpan):
+                self.rowWidgets[rowNum].remove(widget)
+
+            for colNum in range(column, column + columnSpan):
+                self.columnWidgets[colNum].remove(widget)
+
+            self.indexedCount -= 1
+        else:
+            self.cellIndex = None
+
+    # ---------------
+
+    def indexWidget(self, widget, row: int, column: int, rowSpan: int, columnSpan: int):
+        """ Adds the widget to the lists of every row and column it spans, keeping each list in grid order
+        """
+        self.cellIndex[widget] = (row, column, rowSpan, columnSpan)
+
+        for rowNum in range(row, row + rowSpan):
+            rowList = self.rowWidgets.setdefault(rowNum, [])
+            rowList.append(widget)
+            rowList.sort(key=lambda item: self.cellIndex[item][1])
+
+        for colNum in range(column, column + columnSpan):
+            columnList = self.columnWidgets.setdefault(colNum, [])
+            columnList.append(widget)
+            columnList.sort(key=lambda item: self.cellIndex[item][0])
+
+    # ---------------
+
+    def getCellIndex(self) -> dict:
+        """ The widget -> (row, column, rowSpan, columnSpan) index, rebuilt in one pass over the layout items if it is out of date
+        """
+        if self.cellIndex is None or self.grid.count() != self.indexedCount:
+            self.cellIndex      = {}
+            self.rowWidgets     = {}
+            self.columnWidgets  = {}
+
+            for i in range(self.grid.count()):
+                widget = self.grid.itemAt(i).widget()
+                if not widget:
+                    continue
+
+                row, column, rowSpan, columnSpan = self.cellIndex[widget] = self.grid.getItemPosition(i)
+
+                for rowNum in range(row, row + rowSpan):
+                    self.rowWidgets.setdefault(rowNum, []).append(widget)
+
+                for colNum in range(column, column + columnSpan):
+                    self.columnWidgets.setdefault(colNum, []).append(widget)
+
+            # Sorted once at the end rather than on each insert
+            for rowList in self.rowWidgets.values():
+                rowList.sort(key=lambda item: self.cellIndex[item][1])
+
+            for columnList in self.columnWidgets.values():
+                columnList.sort(key=lambda item: self.cellIndex[item][0])
+
+            self.indexedCount = self.grid.count()
+
+        return self.cellIndex
+
+    # ========================================================================================   
+
     # Find the column number of the frame that is being moved to move all frames in the column at once
     def getColumnNumber(self, checkWidget):
-        for colNum in range(self.grid.columnCount()):
-            for row in range(self.grid.rowCount()):
-                item = self.grid.itemAtPosition(row, colNum)
-                if item:
-                    widget = item.widget()
-                    if widget:
-                        if widget == checkWidget:
-                            return colNum
+
+        position = self.getCellIndex().get(checkWidget)
+        if position:
+            return position[1]
 
     # ========================================================================================   
      
     # Find the row number of the frame that is being moved to move all frames in the row at once
     def getRowNumber(self, checkWidget):
-        for rowNum in range(self.grid.rowCount()):
-            for col in range(self.grid.columnCount()):
-                item = self.grid.itemAtPosition(rowNum, col)
-                if item:
-                    widget = item.widget()
-                    if widget:
-                        if widget == checkWidget:
-                            return rowNum
+
+        position = self.getCellIndex().get(checkWidget)
+        if position:
+            return position[0]
 
     # ========================================================================================   
      
     def getColumnWidgets(self, colNum):
-        
-        widgets = []
-        for row in range(self.grid.rowCount()):
-            item = self.grid.itemAtPosition(row, colNum)
-            if item:
-                widget = item.widget()
-                if widget:
-                    widgets.append(widget)
-        return widgets
+
+        self.getCellIndex()
+        return list(self.columnWidgets.get(colNum, ()))
     
     # ========================================================================================   
            
     def getRowWidgets(self, rowNum):
-        
-        widgets = []
-        for col in range(self.grid.columnCount()):
-            item = self.grid.itemAtPosition(rowNum, col)
-            if item:
-                widget = item.widget()
-                if widget:
-                    widgets.append(widget)
-        return widgets
+
+        self.getCellIndex()
+        return list(self.rowWidgets.get(rowNum, ()))
     
     # ========================================================================================  
 
     def resizeEvent(self, event):
 
         super().resizeEvent(event)
-    
+        self.dividerRects = None
+
+        # The first resize lays the grid out straight away, from the stored proportions if there are any, so the grid is
+        # shown at its final sizes
+        if not self.layoutApplied and self.getCellIndex():
+            self.layoutApplied = True
+            self.adjustToWindowSize(self.getStoredProportions())
+            return
+
+        # Re-proportioned once per frame while the window is dragged, not for every intermediate size
+        self.pendingWindowResize = True
+        self.scheduleResize()
+
+
+    # ========================================================================================  
+
+    def adjustToWindowSize(self, proportions: list=None):
+
         if self.direction   == Direction.HORIZONTAL:
-            self.adjustColumnsOnWindowResize()
+            self.adjustColumnsOnWindowResize(proportions)
 
         elif self.direction == Direction.VERTICAL:
-            self.adjustRowsOnWindowResize()
+            self.adjustRowsOnWindowResize(proportions)
+
+    # ========================================================================================  
 
+    def getProportions(self) -> list:
+        """ The share of the grid each column (or row, for vertical grids) takes up, rounded so they store compactly
+        """
+        horizontal  = self.direction == Direction.HORIZONTAL
+        lines       = self.grid.columnCount() if horizontal else self.grid.rowCount()
+        sizes       = []
+
+        for i in range(lines):
+            widgets = self.getColumnWidgets(i) if horizontal else self.getRowWidgets(i)
+            if widgets:
+                sizes.append(widgets[0].width() if horizontal else widgets[0].height())
+
+        total = sum(sizes)
+        return [round(size / total, 4) for size in sizes] if total else []
+
+    # ---------------
+
+    def saveLayout(self):
+
+        if self.gridId is not None and self.layoutStore is not None:
+            self.layoutStore.set(self.gridId, self.getProportions())
+
+    # ---------------
+
+    def getStoredProportions(self):
+        """ The proportions saved for the gridId, or None if there are none
+        """
+        if self.gridId is None or self.layoutStore is None:
+            return None
+
+        proportions = self.layoutStore.get(self.gridId)
+
+        if isinstance(proportions, list) and proportions and all(isinstance(value, (int, float)) and value > 0 for value in proportions):
+            return proportions
+
+        return None
 
     # ========================================================================================  
 
-    def adjustColumnsOnWindowResize(self):
+    def adjustColumnsOnWindowResize(self, proportions: list=None):
+        """ Gives each column its share of the width, keeping the current proportions or using the ones given
+        """
 
         totalWidth      = self.width()
         spacing         = self.grid.layout().horizontalSpacing()
@@ -300,6 +543,11 @@ class ResizeableGrid(QWidget):
                 width = widgets[0].width()
                 currentWidths.append((i, width))
                 currentTotal += width
+
+        # Stored proportions are only used while they still match the columns
+        if proportions and len(proportions) == len(currentWidths):
+            currentWidths   = [(i, proportion) for (i, width), proportion in zip(currentWidths, proportions)]
+            currentTotal    = sum(proportions)
     
         # Calculate and apply new widths based on proportions
         for i, currentWidth in currentWidths:
@@ -317,7 +565,9 @@ class ResizeableGrid(QWidget):
 
     # ========================================================================================  
 
-    def adjustRowsOnWindowResize(self):
+    def adjustRowsOnWindowResize(self, proportions: list=None):
+        """ Gives each row its share of the height, keeping the current proportions or using the ones given
+        """
 
         totalHeight     = self.height()
         spacing         = self.grid.layout().verticalSpacing()
@@ -340,6 +590,11 @@ class ResizeableGrid(QWidget):
                 height = widgets[0].height()
                 currentHeights.append((i, height))
                 currentTotal += height
+
+        # Stored proportions are only used while they still match the rows
+        if proportions and len(proportions) == len(currentHeights):
+            currentHeights  = [(i, proportion) for (i, height), proportion in zip(currentHeights, proportions)]
+            currentTotal    = sum(proportions)
     
         # Calculate and apply new widths based on proportions
         for i, currentHeight in currentHeights:
@@ -0,0 +1,75 @@
+class RowView():
+    """ Read-only view of one query row that can be looked up by column name or position.
+        The row stays the tuple the cursor returned, and every row of a result shares one
+        column name -> position map, so no per-row dictionary is built.
+        Behaves like a read-only dictionary: row["name"], row.get("name"), keys(), items(), dict(row)
+    """
+    __slots__ = ("_values", "_columnIndex")
+
+    def __init__(self, values: tuple, columnIndex: dict):
+        self._values        = values
+        self._columnIndex   = columnIndex
+
+    # ---------------
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self._values[self._columnIndex[key]]
+
+        return self._values[key]
+
+    # ---------------
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except (KeyError, IndexError):
+            return default
+
+    # ---------------
+
+    def __contains__(self, key):
+        return key in self._columnIndex
+
+    # ---------------
+
+    def __iter__(self):
+        return iter(self._columnIndex)
+
+    # ---------------
+
+    def __len__(self):
+        return len(self._columnIndex)
+
+    # ---------------
+
+    def __eq__(self, other):
+        if isinstance(other, RowView):
+            return self.asDict() == other.asDict()
+
+        return self.asDict() == other
+
+    # ---------------
+
+    def __repr__(self):
+        return f"RowView({self.asDict()})"
+
+    # ---------------
+
+    def keys(self):
+        return self._columnIndex.keys()
+
+    # ---------------
+
+    def values(self) -> tuple:
+        return self._values
+
+    # ---------------
+
+    def items(self):
+        return ((name, self._values[position]) for name, position in self._columnIndex.items())
+
+    # ---------------
+
+    def asDict(self) -> dict:
+        return dict(self.items())
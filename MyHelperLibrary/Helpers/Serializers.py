@@ -0,0 +1,138 @@
+import json
+
+
+
+class Serializer():
+    """ Converts data to and from bytes with one JSON or MessagePack library.
+        dumps(data, compact=False) returns bytes, indented unless compact (binary formats are always compact),
+        and loads(raw) accepts bytes or str. decodeErrors holds the exceptions loads raises for invalid input
+    """
+
+    def __init__(self, name: str, dumps, loads, decodeErrors: tuple, binary: bool=False):
+
+        self.name           = name
+        self.dumps          = dumps
+        self.loads          = loads
+        self.decodeErrors   = decodeErrors
+        self.binary         = binary
+
+    # ---------------
+
+    def __repr__(self):
+        return f"Serializer({self.name})"
+
+# ========================================================================================
+
+def _createOrjson() -> Serializer:
+    import orjson
+
+    # orjson only indents by two spaces. Data it can't encode, such as integers over 64 bits, is written by the json module
+    def dumps(data, compact: bool=False) -> bytes:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS | (0 if compact else orjson.OPT_INDENT_2))
+        except orjson.JSONEncodeError:
+            return _jsonDumps(data, compact)
+
+    return Serializer("orjson", dumps, orjson.loads, (orjson.JSONDecodeError,))
+
+# ---------------
+
+def _createMsgspec() -> Serializer:
+    import msgspec
+
+    encoder = msgspec.json.Encoder()
+
+    def dumps(data, compact: bool=False) -> bytes:
+        try:
+            encoded = encoder.encode(data)
+        except (TypeError, OverflowError, msgspec.EncodeError):
+            return _jsonDumps(data, compact)
+
+        return encoded if compact else msgspec.json.format(encoded, indent=4)
+
+    return Serializer("msgspec", dumps, msgspec.json.decode, (msgspec.DecodeError,))
+
+# ---------------
+
+def _createUjson() -> Serializer:
+    import ujson
+
+    def dumps(data, compact: bool=False) -> bytes:
+        if compact:
+            return ujson.dumps(data, ensure_ascii=False).encode("utf-8")
+
+        return ujson.dumps(data, ensure_ascii=False, indent=4).encode("utf-8")
+
+    return Serializer("ujson", dumps, ujson.loads, (ValueError,))
+
+# ---------------
+
+def _jsonDumps(data, compact: bool=False) -> bytes:
+
+    if compact:
+        return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+    return json.dumps(data, indent=4).encode("utf-8")
+
+# ---------------
+
+def _createJson() -> Serializer:
+    return Serializer("json", _jsonDumps, json.loads, (json.JSONDecodeError, UnicodeDecodeError))
+
+# ---------------
+
+def _createMsgpack() -> Serializer:
+
+    try:
+        import msgspec
+
+        return Serializer("msgpack", lambda data, compact=True: msgspec.msgpack.encode(data), msgspec.msgpack.decode,
+                          (msgspec.DecodeError,), binary=True)
+
+    except ImportError:
+        import msgpack
+
+        return Serializer("msgpack", lambda data, compact=True: msgpack.packb(data, use_bin_type=True),
+                          lambda raw: msgpack.unpackb(raw, strict_map_key=False), (ValueError,), binary=True)
+
+# ========================================================================================
+
+""" The serializers by name. "auto" picks the first JSON library of SERIALIZER_PREFERENCE that is installed,
+    "msgpack" is MessagePack through msgspec or msgpack.
+    The faster libraries are opt-in: unlike the json module, which the file helpers use by default, orjson and msgspec write
+    NaN and Infinity as null and indent differently """
+
+SERIALIZER_FACTORIES    = {"orjson": _createOrjson, "msgspec": _createMsgspec, "ujson": _createUjson, "json": _createJson, "msgpack": _createMsgpack}
+SERIALIZER_PREFERENCE   = ("orjson", "msgspec", "ujson", "json")
+SERIALIZERS             = {}
+
+def getSerializer(name: str="auto") -> Serializer:
+    """ Returns the named serializer, created on first use. A Serializer passed in is returned as it is.
+        Raises ImportError if the library of a named serializer is not installed
+    """
+    if isinstance(name, Serializer):
+        return name
+
+    name = name or "auto"
+
+    if name in SERIALIZERS:
+        return SERIALIZERS[name]
+
+    if name == "auto":
+        for preferred in SERIALIZER_PREFERENCE:
+            try:
+                serializer = getSerializer(preferred)
+            except ImportError:
+                continue
+
+            SERIALIZERS["auto"] = serializer
+            return serializer
+
+    try:
+        factory = SERIALIZER_FACTORIES[name]
+    except KeyError:
+        raise ValueError(f"Invalid serializer passed to getSerializer. Serializer was: {name}")
+
+    SERIALIZERS[name] = factory()
+
+    return SERIALIZERS[name]
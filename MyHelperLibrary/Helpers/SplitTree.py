@@ -0,0 +1,448 @@
+from array import array
+from collections import deque
+
+from PySide6.QtWidgets import QWidget, QRubberBand
+from PySide6.QtCore import Qt, QEvent, QPoint, QTimer
+
+from MyHelperLibrary.Helpers.ResizeableGrid import Direction
+
+
+
+DIRECTIONS = {"h": Direction.HORIZONTAL, "horizontal": Direction.HORIZONTAL, Direction.HORIZONTAL: Direction.HORIZONTAL,
+              "v": Direction.VERTICAL,   "vertical": Direction.VERTICAL,     Direction.VERTICAL: Direction.VERTICAL}
+
+# ========================================================================================
+
+class SplitTree():
+    """ Layout engine for nested splits. A node is a pane key, or a split: (direction, [children]) or (direction, [children], [weights]).
+        HORIZONTAL puts the children side by side with dividers going left/right, VERTICAL stacks them, as in ResizeableGrid.
+
+        The nodes are stored breadth first in flat arrays, so every parent comes before its children and the children of a
+        split are contiguous. Each node keeps its fraction of the parent split, which only changes when a divider is moved.
+        The minimum size of every split is summed from its panes once, and solve lays out the whole tree in one forward pass:
+        each split gives its children their fraction, raises the ones below their minimum to it, and takes the difference from
+        the others in proportion to how far each is above its own minimum.
+
+        tree = SplitTree((Direction.HORIZONTAL, ["nav", ("v", ["chart", "table"], [2, 1]), "log"]))
+        tree.solve(1200, 800)
+        tree.getRect("chart")  -> (x, y, width, height)
+    """
+
+    def __init__(self, spec, handleWidth: int=6, minWidth: int=75, minHeight: int=75, minSizes: dict=None):
+
+        self.handleWidth    = handleWidth
+        self.keys           = []                    # pane key of each node, None for splits
+        self.directions     = []                    # Direction of each split, None for panes
+        self.parents        = array("i")
+        self.firstChild     = array("i")            # index of the first child of a split, -1 for panes
+        self.childCount     = array("i")
+        self.fractions      = array("d")            # share of the parent split, the fractions of a split's children add up to 1
+
+        self._build(spec)
+
+        count               = len(self.keys)
+        self.nodeIndex      = {key: node for node, key in enumerate(self.keys) if key is not None}
+        self.minWidths      = array("i", [minWidth]) * count
+        self.minHeights     = array("i", [minHeight]) * count
+
+        for key, (width, height) in (minSizes or {}).items():
+            self.minWidths[self.nodeIndex[key]]     = width
+            self.minHeights[self.nodeIndex[key]]    = height
+
+        # Solved geometry of every node, relative to the root
+        self.x              = array("i", [0]) * count
+        self.y              = array("i", [0]) * count
+        self.widths         = array("i", [0]) * count
+        self.heights        = array("i", [0]) * count
+        self.dividers       = []                    # [(x, y, width, height, split, index)], the handle after child index of the split
+
+        self.updateMinimums()
+
+    # ========================================================================================
+
+    def _build(self, spec):
+        """ Flattens the spec breadth first
+        """
+        queue = deque([(spec, -1, 1.0)])
+
+        while queue:
+            node, parent, fraction = queue.popleft()
+            index = len(self.keys)
+
+            self.parents.append(parent)
+            self.fractions.append(fraction)
+
+            if isinstance(node, tuple):
+                direction, children, *weights = node
+
+                if direction not in DIRECTIONS:
+                    raise ValueError(f"Invalid direction passed to SplitTree. Direction was: {direction}")
+
+                if not children:
+                    raise ValueError("A SplitTree split needs at least one child")
+
+                weights = weights[0] if weights else [1] * len(children)
+                total   = sum(weights)
+
+                self.keys.append(None)
+                self.directions.append(DIRECTIONS[direction])
+                self.firstChild.append(index + 1 + len(queue))      # the children go after everything already queued
+                self.childCount.append(len(children))
+
+                queue.extend((child, index, weight / total) for child, weight in zip(children, weights))
+
+            else:
+                self.keys.append(node)
+                self.directions.append(None)
+                self.firstChild.append(-1)
+                self.childCount.append(0)
+
+    # ---------------
+
+    def updateMinimums(self):
+        """ Sums the minimum size of every split from its children, children first. Call after changing the pane minimums
+        """
+        for node in range(len(self.keys) - 1, -1, -1):
+            count = self.childCount[node]
+            if not count:
+                continue
+
+            first       = self.firstChild[node]
+            children    = range(first, first + count)
+            handles     = self.handleWidth * (count - 1)
+
+            if self.directions[node] == Direction.HORIZONTAL:
+                self.minWidths[node]    = sum(self.minWidths[child] for child in children) + handles
+                self.minHeights[node]   = max(self.minHeights[child] for child in children)
+            else:
+                self.minWidths[node]    = max(self.minWidths[child] for child in children)
+                self.minHeights[node]   = sum(self.minHeights[child] for child in children) + handles
+
+    # ---------------
+
+    def setMinimumSize(self, key, width: int, height: int):
+
+        node = self.nodeIndex[key]
+        self.minWidths[node]    = width
+        self.minHeights[node]   = height
+        self.updateMinimums()
+
+    # ---------------
+
+    def getMinimumSize(self) -> tuple:
+        return self.minWidths[0], self.minHeights[0]
+
+    # ========================================================================================
+
+    def solve(self, width: int, height: int):
+        """ Lays out the whole tree in width x height, parents before children
+        """
+        self.x[0], self.y[0], self.widths[0], self.heights[0] = 0, 0, width, height
+        self.dividers = []
+
+        for node in range(len(self.keys)):
+            if self.childCount[node]:
+                self._solveSplit(node)
+
+    # ---------------
+
+    def _solveSplit(self, node: int):
+        """ Sizes the children of a split along its direction, and gives them its full size across it
+        """
+        first       = self.firstChild[node]
+        count       = self.childCount[node]
+        children    = range(first, first + count)
+        horizontal  = self.directions[node] == Direction.HORIZONTAL
+        minimums    = self.minWidths if horizontal else self.minHeights
+        start       = self.x[node] if horizontal else self.y[node]
+        extent      = self.widths[node] if horizontal else self.heights[node]
+        available   = extent - self.handleWidth * (count - 1)
+
+        sizes       = [self.fractions[child] * available for child in children]
+        deficit     = 0.0
+        slack       = 0.0
+
+        for i, child in enumerate(children):
+            if sizes[i] < minimums[child]:
+                deficit     += minimums[child] - sizes[i]
+                sizes[i]    = minimums[child]
+            else:
+                slack       += sizes[i] - minimums[child]
+
+        # Panes raised to their minimum are paid for by the others, each in proportion to its room above its own minimum.
+        # When there is not enough room for every minimum the panes keep their minimums and overflow the split
+        if deficit:
+            for i, child in enumerate(children):
+                room = sizes[i] - minimums[child]
+
+                if room > 0:
+                    sizes[i] -= min(room, deficit * room / slack) if slack else 0
+
+        # Edges are rounded from the running total, so the sizes add up to the extent without a gap at the end
+        position = float(start)
+
+        for i, child in enumerate(children):
+            edge    = round(position)
+            end     = round(position + sizes[i])
+
+            if horizontal:
+                self.x[child], self.y[child]            = edge, self.y[node]
+                self.widths[child], self.heights[child] = end - edge, self.heights[node]
+            else:
+                self.x[child], self.y[child]            = self.x[node], edge
+                self.widths[child], self.heights[child] = self.widths[node], end - edge
+
+            position += sizes[i]
+
+            if i < count - 1:
+                if horizontal:
+                    self.dividers.append((end, self.y[node], self.handleWidth, self.heights[node], node, i))
+                else:
+                    self.dividers.append((self.x[node], end, self.widths[node], self.handleWidth, node, i))
+
+                position += self.handleWidth
+
+    # ========================================================================================
+
+    def getRect(self, key) -> tuple:
+
+        node = self.nodeIndex[key]
+        return self.x[node], self.y[node], self.widths[node], self.heights[node]
+
+    # ---------------
+
+    def getPaneRects(self):
+        """ Yields (key, (x, y, width, height)) for every pane
+        """
+        for node, key in enumerate(self.keys):
+            if key is not None:
+                yield key, (self.x[node], self.y[node], self.widths[node], self.heights[node])
+
+    # ---------------
+
+    def dividerAt(self, x: int, y: int):
+        """ The (split, index) of the divider handle at the point, or None
+        """
+        for left, top, width, height, split, index in self.dividers:
+            if left <= x < left + width and top <= y < top + height:
+                return split, index
+
+        return None
+
+    # ========================================================================================
+
+    def moveDivider(self, split: int, index: int, position: int) -> bool:
+        """ Moves the divider after child index of the split so it starts at position, along the split's direction,
+            keeping both sides at or above their minimums. The split's fractions are taken from the new sizes.
+            Returns whether anything changed; solve again to lay the tree out
+        """
+        first       = self.firstChild[split]
+        count       = self.childCount[split]
+        horizontal  = self.directions[split] == Direction.HORIZONTAL
+        starts      = self.x if horizontal else self.y
+        extents     = self.widths if horizontal else self.heights
+        minimums    = self.minWidths if horizontal else self.minHeights
+        before      = first + index
+        after       = before + 1
+
+        combined    = extents[before] + extents[after]
+        newSize     = min(max(position - starts[before], minimums[before]), combined - minimums[after])
+
+        if newSize == extents[before] or newSize < minimums[before]:
+            return False
+
+        sizes            = [extents[child] for child in range(first, first + count)]
+        sizes[index]     = newSize
+        sizes[index + 1] = combined - newSize
+        total            = sum(sizes)
+
+        for i, size in enumerate(sizes):
+            self.fractions[first + i] = size / total
+
+        return True
+
+    # ---------------
+
+    def getFractions(self) -> list:
+        return list(self.fractions)
+
+    # ---------------
+
+    def setFractions(self, fractions):
+        """ Restores fractions saved with getFractions, ignored if the tree has a different number of nodes
+        """
+        if len(fractions) == len(self.fractions):
+            self.fractions = array("d", fractions)
+
+# ========================================================================================
+
+class SplitContainer(QWidget):
+    """ Lays out a widget per pane of a SplitTree and lets the user drag the handles between them.
+        The panes are children of the container without a layout: on resize the tree is solved once and every pane is
+        moved in one batch with updates disabled. Drags are applied at most once per frame, or on release with rubberBandPreview.
+
+        container = SplitContainer(("h", ["nav", ("v", ["chart", "table"]), "log"]),
+                                   {"nav": navView, "chart": chartView, "table": tableView, "log": logView})
+    """
+
+    def __init__(self, spec, panes: dict, handleWidth: int=6, minWidth: int=75, minHeight: int=75, minSizes: dict=None,
+                 rubberBandPreview: bool=False, parent=None):
+        super().__init__(parent)
+
+        self.tree               = SplitTree(spec, handleWidth, minWidth, minHeight, minSizes)
+        self.panes              = panes                 # pane key -> widget
+
+        missing = set(self.tree.nodeIndex) - set(panes)
+        if missing:
+            raise ValueError(f"No widget passed to SplitContainer for panes: {sorted(missing, key=str)}")
+
+        for widget in panes.values():
+            widget.setParent(self)
+
+        self.dragDivider        = None                  # (split, index) being dragged
+        self.dragOffset         = 0                     # mouse position inside the handle when the drag started
+        self.pendingDragPos     = None
+        self.rubberBandPreview  = rubberBandPreview
+        self.rubberBand         = None
+
+        self.resizeTimer        = QTimer(self)
+        self.resizeTimer.setSingleShot(True)
+        self.resizeTimer.setInterval(16)                # one frame at 60 Hz
+        self.resizeTimer.timeout.connect(self.applyPendingDrag)
+
+        self.setMinimumSize(*self.tree.getMinimumSize())
+        self.setAttribute(Qt.WA_Hover)
+
+    # ========================================================================================
+
+    def applyGeometry(self):
+        """ Solves the tree for the current size and moves every pane in one batch
+        """
+        self.tree.solve(self.width(), self.height())
+
+        self.setUpdatesEnabled(False)
+
+        for key, rect in self.tree.getPaneRects():
+            self.panes[key].setGeometry(*rect)
+
+        self.setUpdatesEnabled(True)
+
+    # ---------------
+
+    def resizeEvent(self, event):
+
+        super().resizeEvent(event)
+        self.applyGeometry()
+
+    # ========================================================================================
+
+    def event(self, event):
+
+        if event.type() == QEvent.HoverMove and self.dragDivider is None:
+            pos     = event.position().toPoint()
+            divider = self.tree.dividerAt(pos.x(), pos.y())
+
+            if divider is None:
+                self.unsetCursor()
+            else:
+                self.setCursor(Qt.SplitHCursor if self.tree.directions[divider[0]] == Direction.HORIZONTAL else Qt.SplitVCursor)
+
+        return super().event(event)
+
+    # ---------------
+
+    def mousePressEvent(self, event):
+
+        pos     = event.position().toPoint()
+        divider = self.tree.dividerAt(pos.x(), pos.y())
+
+        if event.button() != Qt.LeftButton or divider is None:
+            return super().mousePressEvent(event)
+
+        split, index        = divider
+        horizontal          = self.tree.directions[split] == Direction.HORIZONTAL
+        child               = self.tree.firstChild[split] + index
+        handleStart         = (self.tree.x[child] + self.tree.widths[child]) if horizontal else (self.tree.y[child] + self.tree.heights[child])
+
+        self.dragDivider    = divider
+        self.dragOffset     = (pos.x() if horizontal else pos.y()) - handleStart
+        self.pendingDragPos = None
+
+    # ---------------
+
+    def mouseMoveEvent(self, event):
+
+        if self.dragDivider is None:
+            return super().mouseMoveEvent(event)
+
+        # Only the latest position is kept, the timer applies it once per frame however many moves arrive
+        self.pendingDragPos = event.position().toPoint()
+
+        if not self.resizeTimer.isActive():
+            self.resizeTimer.start()
+
+    # ---------------
+
+    def mouseReleaseEvent(self, event):
+
+        if event.button() != Qt.LeftButton or self.dragDivider is None:
+            return super().mouseReleaseEvent(event)
+
+        # The final geometry is applied now rather than on the next frame
+        self.resizeTimer.stop()
+
+        if self.moveDivider(event.position().toPoint()):
+            self.applyGeometry()
+
+        if self.rubberBand is not None:
+            self.rubberBand.hide()
+
+        self.dragDivider    = None
+        self.pendingDragPos = None
+
+    # ========================================================================================
+
+    def moveDivider(self, pos: QPoint) -> bool:
+
+        split, index    = self.dragDivider
+        horizontal      = self.tree.directions[split] == Direction.HORIZONTAL
+        position        = (pos.x() if horizontal else pos.y()) - self.dragOffset
+
+        return self.tree.moveDivider(split, index, position)
+
+    # ---------------
+
+    def applyPendingDrag(self):
+
+        if self.dragDivider is None or self.pendingDragPos is None:
+            return
+
+        if not self.rubberBandPreview:
+            if self.moveDivider(self.pendingDragPos):
+                self.applyGeometry()
+            return
+
+        # The preview line goes where the handle would, clamped to the minimums, without touching the tree
+        split, index    = self.dragDivider
+        tree            = self.tree
+        horizontal      = tree.directions[split] == Direction.HORIZONTAL
+        before          = tree.firstChild[split] + index
+        after           = before + 1
+        pos             = self.pendingDragPos
+
+        if horizontal:
+            low     = tree.x[before] + tree.minWidths[before]
+            high    = tree.x[after] + tree.widths[after] - tree.minWidths[after] - tree.handleWidth
+            edge    = min(max(pos.x() - self.dragOffset, low), high)
+            rect    = (edge, tree.y[split], tree.handleWidth, tree.heights[split])
+        else:
+            low     = tree.y[before] + tree.minHeights[before]
+            high    = tree.y[after] + tree.heights[after] - tree.minHeights[after] - tree.handleWidth
+            edge    = min(max(pos.y() - self.dragOffset, low), high)
+            rect    = (tree.x[split], edge, tree.widths[split], tree.handleWidth)
+
+        if self.rubberBand is None:
+            self.rubberBand = QRubberBand(QRubberBand.Line, self)
+
+        self.rubberBand.setGeometry(*rect)
+        self.rubberBand.show()
@@ -0,0 +1,136 @@
+from PySide6.QtWidgets import QGridLayout
+
+from MyHelperLibrary.Helpers.WidgetFactory import WidgetFactory, WidgetSpec, FrameSpec, WIDGET_CONSTRUCTORS
+
+
+
+class ViewBuilder():
+    """ Builds a whole widget tree from a declarative spec in one pass.
+        A node is a dictionary, or a tuple shorthand: (type, options) or ("frame", options, children).
+            type:       "frame", or a createWidget type: "label", "button", "date", "lineEdit",
+                        or any other callable returning a widget, called with no arguments
+            options:    the keyword arguments of createLayoutFrame (layoutType, objectName, spacing, sizePolicy, align, margins)
+                        or createWidget (text, objectName, toolTip, sizePolicy, align), plus
+                        name:       key of the widget in the dictionary build returns
+                        children:   the child nodes of a frame
+                        position:   (row, column) or (row, column, rowSpan, columnSpan) in a parent "grid" frame
+                        stretch:    stretch factor in a parent box layout
+
+        The spec is compiled to WidgetSpecs and FrameSpecs once, when the builder is made, so keep a builder per view.
+        build creates the children before their frame and fills each layout before the frame has a parent, so nothing is laid out
+        while the tree is built. The finished tree is added to the parent layout with the parent's updates disabled, then laid out once
+
+        FORM = ViewBuilder(("frame", {"layoutType": "v", "children": [
+                    ("label",    {"text": "Name"}),
+                    ("lineEdit", {"name": "nameEdit"}),
+                    ("button",   {"name": "saveButton", "text": "Save"})]}))
+        root, widgets = FORM.build(parentLayout=self.layout())
+        widgets["saveButton"].clicked.connect(self.save)
+    """
+
+    def __init__(self, spec, factory=None):
+
+        self.factory    = factory
+        self.root       = self._compile(spec)
+
+        self._unpooled  = None
+
+    # ---------------
+
+    def _getUnpooledFactory(self) -> WidgetFactory:
+        """ A factory with no pools, it only creates widgets. Made on first build, as widgets can't be made before the QApplication
+        """
+        if self._unpooled is None:
+            self._unpooled = WidgetFactory(maxPoolSize=0)
+
+        return self._unpooled
+
+    # ========================================================================================
+
+    def build(self, parentLayout=None, factory=None):
+        """ Creates the tree, adding the root to parentLayout if one is given.
+            Widgets come from the factory's pools if a WidgetFactory is given here or to the builder.
+            Returns (root widget, {name: widget})
+        """
+        factory = factory or self.factory or self._getUnpooledFactory()
+        named   = {}
+        root    = self._build(self.root, factory, named)
+
+        if parentLayout is not None:
+            parent = parentLayout.parentWidget()
+
+            if parent is not None:
+                parent.setUpdatesEnabled(False)
+
+            parentLayout.addWidget(root)
+            parentLayout.activate()
+
+            if parent is not None:
+                parent.setUpdatesEnabled(True)
+
+        return root, named
+
+    # ========================================================================================
+
+    def _compile(self, node) -> tuple:
+        """ Turns a node into (spec or callable, name, children, position, stretch)
+        """
+        if isinstance(node, tuple):
+            nodeType, options, *children = node
+            options = dict(options or {})
+
+            if children:
+                options["children"] = children[0]
+
+        else:
+            options     = dict(node)
+            nodeType    = options.pop("type")
+
+        name        = options.pop("name", None)
+        children    = options.pop("children", ())
+        position    = options.pop("position", None)
+        stretch     = options.pop("stretch", 0)
+
+        if nodeType == "frame":
+            spec = FrameSpec(**options)
+
+        elif nodeType in WIDGET_CONSTRUCTORS:
+            spec = WidgetSpec(nodeType, **options)
+
+        elif callable(nodeType):
+            spec = nodeType
+
+        else:
+            raise ValueError(f"Invalid node type passed to ViewBuilder. Type was: {nodeType}")
+
+        return spec, name, tuple(self._compile(child) for child in children), position, stretch
+
+    # ========================================================================================
+
+    def _build(self, node: tuple, factory, named: dict):
+
+        spec, name, children = node[:3]
+
+        if isinstance(spec, (WidgetSpec, FrameSpec)):
+            widget = factory.create(spec)
+        else:
+            widget = spec()
+
+        if children:
+            layout = widget.layout()
+            isGrid = isinstance(layout, QGridLayout)
+
+            for row, child in enumerate(children):
+                childWidget             = self._build(child, factory, named)
+                position, stretch       = child[3], child[4]
+
+                # Grid children without a position go one per row
+                if isGrid:
+                    layout.addWidget(childWidget, *(position or (row, 0)))
+                else:
+                    layout.addWidget(childWidget, stretch)
+
+        if name:
+            named[name] = widget
+
+        return widget
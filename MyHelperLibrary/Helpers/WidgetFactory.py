@@ -0,0 +1,340 @@
+from PySide6.QtWidgets import QWidget, QLabel, QLineEdit, QDateEdit, QPushButton, QFrame, QHBoxLayout, QVBoxLayout, QGridLayout
+from PySide6.QtCore import Qt, QDate, QObject, QMetaMethod
+from PySide6.QtGui import QIcon
+from shiboken6 import isValid
+
+from MyHelperLibrary.Helpers.HelperMethods import getSizePolicyMap, getAlignMap
+
+
+
+# ========================================================================================
+
+def _createDateEdit() -> QDateEdit:
+
+    item = QDateEdit()
+    item.setCalendarPopup(True)
+    item.setDisplayFormat("dd-MMM-yyyy")
+    item.setDate(QDate.currentDate())
+
+    return item
+
+# ---------------
+
+""" The constructor of each widget type createWidget accepts, and the layout class of each layout type createLayoutFrame accepts """
+
+WIDGET_CONSTRUCTORS = {"label": QLabel, "button": QPushButton, "date": _createDateEdit, "lineEdit": QLineEdit}
+
+LAYOUT_TYPES        = {"vertical": QVBoxLayout, "v": QVBoxLayout, "grid": QGridLayout, "g": QGridLayout}
+
+POOL_KEYS           = {QLabel: "label", QPushButton: "button", QDateEdit: "date", QLineEdit: "lineEdit"}
+
+# ========================================================================================
+
+class WidgetSpec():
+    """ Precompiled arguments of createWidget. The size policy and alignment are resolved once, when the spec is made,
+        so creating a widget from the spec only costs the constructor and the setters. Make specs once, e.g. as class attributes of a view
+    """
+    __slots__ = ("widgetType", "poolKey", "text", "objectName", "toolTip", "sizePolicy", "alignment")
+
+    def __init__(self, widgetType: str, text: str=None, objectName: str=None, toolTip=None, sizePolicy: tuple[str, str]=None, align=None):
+
+        if widgetType not in WIDGET_CONSTRUCTORS:
+            raise ValueError(f"Invalid widgetType passed to WidgetSpec. widgetType was: {widgetType}")
+
+        self.widgetType = widgetType
+        self.poolKey    = widgetType
+        self.text       = text
+        self.objectName = objectName
+        self.toolTip    = toolTip
+        self.sizePolicy = getSizePolicyMap(sizePolicy) if sizePolicy else None
+        self.alignment  = getAlignMap(align) if align else None
+
+# ========================================================================================
+
+class FrameSpec():
+    """ Precompiled arguments of createLayoutFrame, see WidgetSpec
+    """
+    __slots__ = ("layoutClass", "poolKey", "objectName", "toolTip", "spacing", "sizePolicy", "alignment", "margins")
+
+    def __init__(self, layoutType=None, objectName: str=None, spacing: int=None, sizePolicy: tuple[str, str]=None, align: str=None, margins: tuple[int, int, int, int]=None):
+
+        self.layoutClass    = LAYOUT_TYPES.get(layoutType, QHBoxLayout)
+        self.poolKey        = ("frame", self.layoutClass.__name__)
+        self.objectName     = objectName
+        self.toolTip        = None
+        self.spacing        = spacing
+        self.sizePolicy     = getSizePolicyMap(sizePolicy) if sizePolicy else None
+        self.alignment      = getAlignMap(align) if align else None
+        self.margins        = margins
+
+# ========================================================================================
+
+class WidgetFactory():
+    """ Creates widgets and layout frames from WidgetSpecs and FrameSpecs, and recycles them.
+        Widgets given back with release, or through clearLayout/clearStackedLayout(..., factory=factory), go into a pool per type
+        instead of being deleted, and the next create of that type takes one from the pool and resets it, so switching
+        between views reuses the widgets of the last one. Each pool holds at most maxPoolSize widgets, the rest are deleted.
+        Pooled widgets are kept under a hidden holder widget. Every signal of a released widget is disconnected, and a reused widget
+        is reset to how its constructor made it, including visibility, enabled state, style sheet, size limits and the settings of its type.
+        Settings the reset doesn't cover, such as event filters or attributes added in Python, carry over, so don't pool widgets that have them.
+
+        factory = WidgetFactory()
+        TITLE   = WidgetSpec("label", objectName="title", align="center")
+        label   = factory.create(TITLE, text="Accounts")
+    """
+
+    def __init__(self, maxPoolSize: int=500):
+
+        self.maxPoolSize    = maxPoolSize
+        self.pools          = {}                # poolKey -> released widgets
+        self.created        = 0
+        self.reused         = 0
+
+        self._holder        = None              # never shown, parents the pooled widgets. Made on first release
+        self._defaults      = {}                # poolKey -> defaults read from the first widget made, restored on reuse
+
+    # ========================================================================================
+
+    def create(self, spec, text: str=None, toolTip=None):
+        """ Returns a widget for the spec, from the pool if one has been released. text and toolTip override the spec's
+        """
+        widget = self._takeFromPool(spec.poolKey)
+
+        if widget is None:
+            widget = self._construct(spec)
+            self.created += 1
+
+        else:
+            self._reset(spec, widget)
+            self.reused += 1
+
+        if spec.objectName:
+            widget.setObjectName(spec.objectName)
+
+        if toolTip or spec.toolTip:
+            widget.setToolTip(toolTip or spec.toolTip)
+
+        if spec.sizePolicy is not None:
+            widget.setSizePolicy(spec.sizePolicy)
+
+        if isinstance(spec, FrameSpec):
+            self._applyLayout(spec, widget.layout())
+
+        else:
+            # A date edit has no text, createWidget ignores it for dates too
+            if spec.widgetType != "date" and (text is not None or spec.text is not None):
+                widget.setText(text if text is not None else spec.text)
+
+            if spec.alignment is not None:
+                widget.setAlignment(spec.alignment)
+
+        return widget
+
+    # ========================================================================================
+
+    def release(self, widget):
+        """ Takes the widget out of its layout and puts it in its pool. Widgets of a frame's layout are released with it,
+            widgets the factory can't make are deleted
+        """
+        if not isValid(widget):
+            return
+
+        poolKey = self._getPoolKey(widget)
+        pool    = self.pools.setdefault(poolKey, []) if poolKey else None
+
+        if pool is None or len(pool) >= self.maxPoolSize:
+            widget.setParent(None)
+            widget.deleteLater()
+            return
+
+        if isinstance(poolKey, tuple):
+            self.releaseLayout(widget.layout())
+
+        _disconnectAll(widget)
+
+        if self._holder is None:
+            self._holder = QWidget()
+
+        widget.setParent(self._holder)
+        pool.append(widget)
+
+    # ---------------
+
+    def releaseLayout(self, layout):
+        """ Releases every widget of the layout, leaving the layout empty
+        """
+        while layout.count():
+            item = layout.takeAt(0)
+
+            if item.widget():
+                self.release(item.widget())
+
+            elif item.layout():
+                self.releaseLayout(item.layout())
+
+    # ---------------
+
+    def clearPools(self):
+
+        for pool in self.pools.values():
+            for widget in pool:
+                if isValid(widget):
+                    widget.deleteLater()
+
+        self.pools.clear()
+
+    # ========================================================================================
+
+    def _takeFromPool(self, poolKey):
+
+        pool = self.pools.get(poolKey)
+
+        # Widgets deleted by Qt while pooled, e.g. along with a parent, are skipped
+        while pool:
+            widget = pool.pop()
+            if isValid(widget):
+                return widget
+
+        return None
+
+    # ---------------
+
+    def _construct(self, spec):
+
+        if isinstance(spec, FrameSpec):
+            widget = QFrame()
+            widget.setLayout(spec.layoutClass())
+        else:
+            widget = WIDGET_CONSTRUCTORS[spec.widgetType]()
+
+        if spec.poolKey not in self._defaults:
+            if isinstance(spec, FrameSpec):
+                layoutDefaults = (widget.layout().contentsMargins(), widget.layout().alignment(), widget.frameStyle())
+                alignment      = None
+            else:
+                layoutDefaults = None
+                alignment      = widget.alignment() if hasattr(widget, "alignment") else None
+
+            self._defaults[spec.poolKey] = (widget.sizePolicy(), widget.minimumSize(), widget.maximumSize(), alignment, layoutDefaults)
+
+        return widget
+
+    # ---------------
+
+    def _reset(self, spec, widget):
+        """ Puts a pooled widget back to how the constructor made it, for the settings the spec could have changed
+        """
+        # Widgets released to the factory without being made by it leave no defaults, so they are read from a new widget
+        if spec.poolKey not in self._defaults:
+            self._construct(spec).deleteLater()
+
+        sizePolicy, minimumSize, maximumSize, alignment, layoutDefaults = self._defaults[spec.poolKey]
+
+        widget.setObjectName("")
+        widget.setToolTip("")
+        widget.setStyleSheet("")
+        widget.setEnabled(True)
+        widget.setSizePolicy(sizePolicy)
+        widget.setMinimumSize(minimumSize)
+        widget.setMaximumSize(maximumSize)
+
+        # A widget hidden with hide() stays hidden when added to a layout, so the explicit hide is forgotten
+        widget.setAttribute(Qt.WA_WState_ExplicitShowHide, False)
+
+        for name in widget.dynamicPropertyNames():
+            widget.setProperty(bytes(name).decode(), None)
+
+        if isinstance(spec, FrameSpec):
+            self._resetLayout(widget, *layoutDefaults)
+            return
+
+        if alignment is not None:
+            widget.setAlignment(alignment)
+
+        if spec.widgetType == "date":
+            widget.setReadOnly(False)
+            widget.clearMinimumDate()
+            widget.clearMaximumDate()
+            widget.setCalendarPopup(True)
+            widget.setDisplayFormat("dd-MMM-yyyy")
+            widget.setDate(QDate.currentDate())
+
+        elif spec.widgetType == "lineEdit":
+            widget.setReadOnly(False)
+            widget.setValidator(None)
+            widget.setPlaceholderText("")
+            widget.setMaxLength(32767)
+            widget.setEchoMode(QLineEdit.Normal)
+            widget.clear()
+
+        elif spec.widgetType == "button":
+            widget.setChecked(False)
+            widget.setCheckable(False)
+            widget.setIcon(QIcon())
+            widget.setFlat(False)
+            widget.setText("")
+
+        else:
+            widget.setWordWrap(False)
+            widget.setText("")
+
+    # ---------------
+
+    def _resetLayout(self, frame, margins, alignment, frameStyle):
+
+        layout = frame.layout()
+        frame.setFrameStyle(frameStyle)
+        layout.setSpacing(-1)
+        layout.setContentsMargins(margins)
+        layout.setAlignment(alignment)
+
+        # Stretch factors and minimums of a grid stay with the layout after its widgets are taken out
+        if isinstance(layout, QGridLayout):
+            layout.setHorizontalSpacing(-1)
+            layout.setVerticalSpacing(-1)
+
+            for row in range(layout.rowCount()):
+                layout.setRowStretch(row, 0)
+                layout.setRowMinimumHeight(row, 0)
+
+            for column in range(layout.columnCount()):
+                layout.setColumnStretch(column, 0)
+                layout.setColumnMinimumWidth(column, 0)
+
+    # ---------------
+
+    def _applyLayout(self, spec: FrameSpec, layout):
+
+        if spec.spacing is not None:
+            layout.setSpacing(spec.spacing)
+
+        if spec.alignment is not None:
+            layout.setAlignment(spec.alignment)
+
+        if spec.margins:
+            layout.setContentsMargins(*spec.margins)
+
+    # ---------------
+
+    def _getPoolKey(self, widget):
+
+        # Only the exact classes the factory makes are pooled, not subclasses
+        if type(widget) is QFrame and type(widget.layout()) in (QHBoxLayout, QVBoxLayout, QGridLayout):
+            return ("frame", type(widget.layout()).__name__)
+
+        return POOL_KEYS.get(type(widget))
+
+# ========================================================================================
+
+def _disconnectAll(widget):
+    """ Disconnects every signal of the widget from QWidget's down, so a pooled widget does not call back into the view it was released from.
+        QObject's own signals, such as destroyed, are left to Qt
+    """
+    metaObject = widget.metaObject()
+
+    for index in range(QObject.staticMetaObject.methodCount(), metaObject.methodCount()):
+        method = metaObject.method(index)
+
+        # Only connected signals are disconnected, disconnecting one without connections warns or raises depending on the PySide6 version
+        if method.methodType() == QMetaMethod.Signal and widget.isSignalConnected(method):
+            getattr(widget, bytes(method.name()).decode()).disconnect()
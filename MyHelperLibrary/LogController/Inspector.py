@@ -0,0 +1,124 @@
+from collections import Counter
+from collections.abc import Mapping, Sequence, Set
+from itertools import islice
+
+from PySide6.QtWidgets import QWidget
+
+
+
+class DataInspector():
+    """ Describes logged data as LogRow cells, see LogBuffer.CELL_FORMATS.
+        Nested containers are followed down to maxDepth, and only the first maxItems members of each container are described,
+        followed by a "... N more" cell. Containers longer than maxItems also get an element type histogram taken from
+        an evenly spaced sample of sampleSize members, and numpy style arrays are summarised by their shape and dtype,
+        so the cost of logging does not grow with the size of the data. A row stops at maxCells cells
+    """
+
+    SCALAR_TYPES = (str, int, float, bool, bytes, type(None))
+
+    def __init__(self, maxDepth: int=3, maxItems: int=20, sampleSize: int=100, maxCells: int=500):
+
+        self.maxDepth   = maxDepth
+        self.maxItems   = maxItems
+        self.sampleSize = sampleSize
+        self.maxCells   = maxCells
+
+    # ========================================================================================
+
+    def inspect(self, data) -> list:
+        """ Returns the cells describing data. A top level list is described by its length and members
+        """
+        cells = []
+
+        if isinstance(data, list):
+            cells.append(("length", len(data)))
+            self._describeMembers(data, 0, cells)
+        else:
+            self._describe(data, 0, cells)
+
+        if len(cells) > self.maxCells:
+            del cells[self.maxCells:]
+            cells.append(("truncated", None))
+
+        return cells
+
+    # ========================================================================================
+
+    def _describe(self, dataPoint, depth: int, cells: list):
+
+        if len(cells) > self.maxCells:
+            return
+
+        cells.append(("type", type(dataPoint)))
+
+        if isinstance(dataPoint, self.SCALAR_TYPES):
+            cells.append(("value", dataPoint))
+
+        elif isinstance(dataPoint, QWidget):
+            cells.append(("objectName", dataPoint.objectName()))
+
+        # numpy arrays and anything else with a shape and dtype, described without touching the elements
+        elif hasattr(dataPoint, "shape") and hasattr(dataPoint, "dtype"):
+            cells.append(("shape", tuple(dataPoint.shape)))
+            cells.append(("dtype", dataPoint.dtype))
+
+        elif isinstance(dataPoint, Mapping):
+            cells.append(("container", type(dataPoint).__name__))
+            cells.append(("containerLength", len(dataPoint)))
+            self._describeMembers(dataPoint, depth, cells)
+
+        elif isinstance(dataPoint, list):
+            cells.append(("array", None))
+            cells.append(("arrayLength", len(dataPoint)))
+            self._describeMembers(dataPoint, depth, cells)
+
+        elif isinstance(dataPoint, (Sequence, Set)):
+            cells.append(("container", type(dataPoint).__name__))
+            cells.append(("containerLength", len(dataPoint)))
+            self._describeMembers(dataPoint, depth, cells)
+
+    # ========================================================================================
+
+    def _describeMembers(self, container, depth: int, cells: list):
+        """ Adds the element type histogram for long containers, then the first maxItems members
+        """
+        length = len(container)
+
+        if length > self.maxItems:
+            cells.append(("elementTypes", self._elementTypes(container, length)))
+
+        if depth >= self.maxDepth:
+            if length:
+                cells.append(("more", length))
+            return
+
+        if isinstance(container, Mapping):
+            for key, value in islice(container.items(), self.maxItems):
+                cells.append(("key", key))
+                self._describe(value, depth + 1, cells)
+        else:
+            for member in islice(container, self.maxItems):
+                self._describe(member, depth + 1, cells)
+
+        if length > self.maxItems:
+            cells.append(("more", length - self.maxItems))
+
+    # ========================================================================================
+
+    def _elementTypes(self, container, length: int) -> tuple:
+        """ Counts the element types of an evenly spaced sample. Returns (((typeName, count), ...), sampleCount, length)
+        """
+        if isinstance(container, Mapping):
+            sample = islice(container.values(), self.sampleSize)
+
+        elif isinstance(container, Sequence):
+            step    = max(1, length // self.sampleSize)
+            sample  = (container[i] for i in range(0, length, step))
+            sample  = islice(sample, self.sampleSize)
+
+        else:
+            sample = islice(container, self.sampleSize)
+
+        counts = Counter(type(member).__name__ for member in sample)
+
+        return tuple(counts.most_common()), sum(counts.values()), length
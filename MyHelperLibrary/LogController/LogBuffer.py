@@ -0,0 +1,168 @@
+# ========================================================================================
+
+""" How each kind of cell is turned into text. Cells keep the raw value and are only formatted when displayed """
+
+MAX_CELL_TEXT = 200
+
+# The spill file is one row per line with tab separated cells, so separators inside a cell are escaped
+SPILL_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+def _truncate(text: str) -> str:
+    return text if len(text) <= MAX_CELL_TEXT else f"{text[:MAX_CELL_TEXT]}..."
+
+def _formatElementTypes(value) -> str:
+    counts, sampled, length = value
+    types = ", ".join(f"{typeName} x {count}" for typeName, count in counts)
+    return f"Element types: {types} (sampled {sampled} of {length})"
+
+CELL_FORMATS = {
+    "label"             : lambda value: f"Label: {value}",
+    "length"            : lambda value: f"Total data length: {value}",
+    "type"              : lambda value: f"Type: {value}",
+    "objectName"        : lambda value: f"Object Name: {value}",
+    "value"             : lambda value: _truncate(str(value)),
+    "array"             : lambda value: "Array found",
+    "arrayLength"       : lambda value: f"Array length: {value}",
+    "container"         : lambda value: f"{value} found",
+    "containerLength"   : lambda value: f"Length: {value}",
+    "key"               : lambda value: _truncate(f"Key: {value}"),
+    "shape"             : lambda value: f"Shape: {value}",
+    "dtype"             : lambda value: f"Dtype: {value}",
+    "elementTypes"      : _formatElementTypes,
+    "more"              : lambda value: f"... {value} more",
+    "truncated"         : lambda value: "... row truncated",
+}
+
+# ========================================================================================
+
+class LogRow():
+    """ One logged row. Holds a tuple of (kind, value) cells, see CELL_FORMATS, and the level it was logged at
+    """
+    __slots__ = ("cells", "level")
+
+    def __init__(self, cells: tuple, level: str="INFO"):
+        self.cells = cells
+        self.level = level
+
+    # ---------------
+
+    def __len__(self):
+        return len(self.cells)
+
+    # ---------------
+
+    def cellText(self, column: int) -> str:
+        kind, value = self.cells[column]
+        return CELL_FORMATS[kind](value)
+
+    # ---------------
+
+    def text(self) -> tuple:
+        return tuple(CELL_FORMATS[kind](value) for kind, value in self.cells)
+
+# ========================================================================================
+
+class LogBuffer():
+    """ Fixed capacity ring buffer of log rows. Once it is full every new row evicts the oldest one.
+        If a spillPath is given, evicted rows are appended to that file as tab separated text before they are dropped.
+        Rows are numbered in the order they were added: the row at position i has sequence number firstSequence + i
+    """
+
+    def __init__(self, capacity: int=100000, spillPath: str=None):
+
+        if capacity < 1:
+            raise ValueError(f"LogBuffer capacity must be at least 1. Capacity was: {capacity}")
+
+        self.capacity       = capacity
+        self.spillPath      = spillPath
+        self.firstSequence  = 0                 # how many rows have been evicted
+
+        self._slots         = [None] * capacity
+        self._start         = 0
+        self._count         = 0
+        self._spillFile     = None
+
+    # ---------------
+
+    def __len__(self):
+        return self._count
+
+    # ---------------
+
+    def __getitem__(self, position: int) -> LogRow:
+
+        if position < 0:
+            position += self._count
+
+        if not 0 <= position < self._count:
+            raise IndexError(f"LogBuffer position out of range: {position}")
+
+        return self._slots[(self._start + position) % self.capacity]
+
+    # ---------------
+
+    def __iter__(self):
+        for position in range(self._count):
+            yield self._slots[(self._start + position) % self.capacity]
+
+    # ---------------
+
+    def append(self, row: LogRow):
+
+        if self._count == self.capacity:
+            self.evict(1)
+
+        self._slots[(self._start + self._count) % self.capacity] = row
+        self._count += 1
+
+    # ---------------
+
+    def extend(self, rows: list):
+
+        # Rows beyond the capacity would be evicted straight away, so they go directly to the spill file
+        excess = len(rows) - self.capacity
+        if excess > 0:
+            self.evict(self._count)
+            self.spill(rows[:excess])
+            self.firstSequence += excess
+            rows                = rows[excess:]
+
+        for row in rows:
+            self.append(row)
+
+    # ---------------
+
+    def evict(self, count: int):
+        """ Removes the oldest rows, spilling them first if a spill file is set
+        """
+        count = min(count, self._count)
+
+        if self.spillPath:
+            self.spill(self[position] for position in range(count))
+
+        for position in range(count):
+            self._slots[(self._start + position) % self.capacity] = None
+
+        self._start          = (self._start + count) % self.capacity
+        self._count         -= count
+        self.firstSequence  += count
+
+    # ---------------
+
+    def spill(self, rows):
+        """ Appends rows to the spill file. Also used for rows that were evicted before they were ever stored
+        """
+        if not self.spillPath:
+            return
+
+        if not self._spillFile:
+            self._spillFile = open(self.spillPath, "a", encoding="utf-8")
+
+        self._spillFile.writelines("\t".join(cell.translate(SPILL_ESCAPES) for cell in (row.level, *row.text())) + "\n" for row in rows)
+
+    # ---------------
+
+    def close(self):
+        if self._spillFile:
+            self._spillFile.close()
+            self._spillFile = None
@@ -1,32 +1,54 @@
 from icecream import ic
-from PySide6.QtWidgets import QMainWindow, QLabel, QWidget, QSizePolicy
+import threading
+from PySide6.QtWidgets import QMainWindow
+from PySide6.QtCore import QTimer, Signal
 
 from UiViews.UiLogControllerWindow import Ui_LogControllerWindow
 from LogView import LogView
+from LogBuffer import LogBuffer, LogRow
+from Inspector import DataInspector
 
 
 
 class LogController(QMainWindow):
+    """ Window that displays logged data as rows.
+        @maxRows:   the most rows kept. Once reached, the oldest rows are evicted
+        @spillPath: optional text file the evicted rows are appended to
+        @coalesceUpdates: log() only queues the row, and the queued rows are added to the view together 
+                          at most once every flushInterval ms. In this mode log() can also be called from worker threads
+        @inspector: the DataInspector that limits how deep and how much of the logged data is described
+    """
+
+    # Emitted when the first row is queued, so the flush timer is started on the GUI thread
+    flushRequested = Signal()
     
-    def __init__(self):
+    def __init__(self, maxRows: int=100000, spillPath: str=None, coalesceUpdates: bool=False, flushInterval: int=16, inspector: DataInspector=None):
         super().__init__()
 
         self.window = Ui_LogControllerWindow()
         self.window.setupUi(self)
         self.setWindowTitle("Log")
         
+        self.logData    = LogBuffer(maxRows, spillPath)
+        self.inspector  = inspector or DataInspector()
 
         self.displayLogView()
         self.setGeometry(4100, 50, 1200, 700)
         
-        self.logData = []
-        
         self.red    = 0
         self.blue   = 0
         self.green  = 0
-        
-        self.row    = 0
-        self.column = 0
+
+        self.coalesceUpdates    = coalesceUpdates
+        self.pendingRows        = []
+        self.pendingLock        = threading.Lock()
+        self.flushScheduled     = False
+
+        self.flushTimer = QTimer(self)
+        self.flushTimer.setSingleShot(True)
+        self.flushTimer.setInterval(flushInterval)
+        self.flushTimer.timeout.connect(self.flushPendingRows)
+        self.flushRequested.connect(self.startFlushTimer)
         
 
     # ========================================================================================
@@ -37,6 +59,15 @@ class LogController(QMainWindow):
 
 
     # ========================================================================================
+
+
+    def closeEvent(self, event):
+        self.flushPendingRows()
+        self.logData.close()
+        super().closeEvent(event)
+
+
+    # ========================================================================================
     
     
     def displayLogView(self):
@@ -50,61 +81,59 @@ class LogController(QMainWindow):
     # ========================================================================================
     
     
-    def log(self, description, data):
-        self.logRow = []
-        
-        self.logRow.append(f"Label: {description}")
-        
-        if isinstance(data, list):
-            self.logRow.append(f"Total data length: {str(len(data))}")
+    def log(self, description, data, level: str="INFO"):
+        cells   = [("label", description), *self.inspector.inspect(data)]
+        logRow  = LogRow(tuple(cells), level.upper())
+
+        if not self.coalesceUpdates:
+            self.display(logRow)             # Displaying the row stores it in logData
+            return
+
+        with self.pendingLock:
+            self.pendingRows.append(logRow)
+
+            if self.flushScheduled:
+                return
             
-            for d in data:
-                self.checkTypes(d)
-                    
-                if isinstance(d, list):
-                    self.logRow.append(f"Array found")
-                    self.logRow.append(f"Array length: {str(len(d))}")
-                    
-                    for member in d:
-                        self.checkTypes(member)
-        else:
-            self.checkTypes(data)
-           
-        self.logData.append(self.logRow)
-        self.display(self.logRow)
+            self.flushScheduled = True
+
+        # Queued across to the GUI thread if log was called from a worker thread
+        self.flushRequested.emit()
 
 
 
     # ========================================================================================
-    
 
-    def checkTypes(self, dataPoint):
-        
-        self.logRow.append(f"Type: {type(dataPoint)}")
-                        
-        if isinstance(dataPoint, QWidget):
-            self.logRow.append(f"Object Name: {dataPoint.objectName()}")
 
-        elif isinstance(dataPoint, int):
-            self.logRow.append(str(dataPoint))
-                            
-        elif isinstance(dataPoint, str):
-            self.logRow.append(dataPoint)
+    def startFlushTimer(self):
+        if not self.flushTimer.isActive():
+            self.flushTimer.start()
+
+
+    # ========================================================================================
+
+
+    def flushPendingRows(self):
+        """ Adds every queued row to the view in one batch
+        """
+        with self.pendingLock:
+            rows                = self.pendingRows
+            self.pendingRows    = []
+            self.flushScheduled = False
 
+        self.displayRows(rows)
 
 
     # ========================================================================================
 
 
     def display(self, logRow):
-        self.column = 0
-        
-        for l in logRow:
-            ic(l)
-            label = QLabel(str(l))
-            label.setSizePolicy(QSizePolicy.Minimum, QSizePolicy.Minimum)
-            self.logView.window.TextGridFrame.layout().addWidget(label, self.row, self.column)
-            label.setStyleSheet(f"color: rgb({self.red + 1}, 255, {self.green + 1})")
-            self.column +=1
-            
-        self.row += 1
+        self.displayRows([logRow])
+
+
+    # ========================================================================================
+
+
+    def displayRows(self, logRows: list):
+        self.logView.model.foreground.setRgb(self.red + 1, 255, self.green + 1)
+        self.logView.model.appendRows(logRows)
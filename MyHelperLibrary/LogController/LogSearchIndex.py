@@ -0,0 +1,138 @@
+import re
+import bisect
+from collections import defaultdict
+
+from LogBuffer import LogRow
+
+
+
+WORD_PATTERN = re.compile(r"\w+")
+
+# ========================================================================================
+
+def getRowWords(row: LogRow) -> set:
+    """ The lower case words in the text of every cell of the row. The row is formatted to get them, so an indexed row is formatted
+        when it arrives rather than only when it is displayed. Searching the words as displayed is worth that cost
+    """
+    return set(WORD_PATTERN.findall(" ".join(row.text()).lower()))
+
+# ========================================================================================
+
+def getRowTypes(row: LogRow) -> set:
+    """ The names of the types logged in the row
+    """
+    return {value.__name__ for kind, value in row.cells if kind == "type"}
+
+# ========================================================================================
+
+class LogSearchIndex():
+    """ Inverted index over the rows of a LogBuffer, updated as rows are added.
+        Maps every word, type name and level to the ascending sequence numbers of the rows that contain it,
+        so a search intersects a few lists instead of reading every row.
+        Evicted rows are skipped in results, and their entries are pruned once as many rows have been evicted as the buffer holds.
+        Indexing formats every row once as it is added, see getRowWords
+    """
+
+    def __init__(self, capacity: int):
+
+        self.capacity       = capacity
+        self.words          = defaultdict(list)
+        self.types          = defaultdict(list)
+        self.levels         = defaultdict(list)
+        self.firstSequence  = 0
+        self.nextSequence   = 0                 # one past the last row added
+        self._prunedAt      = 0
+
+    # ========================================================================================
+
+    def addRow(self, sequence: int, row: LogRow):
+
+        self.nextSequence = sequence + 1
+
+        for word in getRowWords(row):
+            self.words[word].append(sequence)
+
+        for typeName in getRowTypes(row):
+            self.types[typeName].append(sequence)
+
+        self.levels[row.level].append(sequence)
+
+    # ========================================================================================
+
+    def evictBefore(self, sequence: int):
+        """ Marks every row before the sequence number as evicted
+        """
+        self.firstSequence = sequence
+
+        if self.firstSequence - self._prunedAt < self.capacity:
+            return
+
+        for postings in (self.words, self.types, self.levels):
+            for key in list(postings):
+                sequences = postings[key]
+                live      = sequences[bisect.bisect_left(sequences, self.firstSequence):]
+
+                if live:
+                    postings[key] = live
+                else:
+                    del postings[key]
+
+        self._prunedAt = self.firstSequence
+
+    # ========================================================================================
+
+    def search(self, text: str=None, typeName: str=None, level: str=None) -> list:
+        """ Sequence numbers, ascending, of the rows that contain every word of the text and match the type and level.
+            Text without words, such as punctuation, matches every row, as in rowMatches
+        """
+        postings = []
+
+        for word in set(WORD_PATTERN.findall((text or "").lower())):
+            postings.append(self.words.get(word, []))
+
+        if typeName:
+            postings.append(self.types.get(typeName, []))
+
+        if level:
+            postings.append(self.levels.get(level, []))
+
+        if not postings:
+            return list(range(self.firstSequence, self.nextSequence))
+
+        postings.sort(key=len)
+        smallest = postings[0]
+        smallest = smallest[bisect.bisect_left(smallest, self.firstSequence):]
+
+        if len(postings) == 1:
+            return list(smallest)
+
+        # Lists much longer than the smallest are probed with a binary search rather than read in full
+        matches = smallest
+        for sequences in postings[1:]:
+            if len(matches) * 16 < len(sequences):
+                matches = [sequence for sequence in matches if _contains(sequences, sequence)]
+            else:
+                matches = sorted(set(matches).intersection(sequences))
+
+        return matches
+
+    # ========================================================================================
+
+    def rowMatches(self, row: LogRow, text: str=None, typeName: str=None, level: str=None) -> bool:
+        """ Checks a single row against the same filters as search, used for rows that arrive while a filter is applied
+        """
+        if level and row.level != level:
+            return False
+
+        if typeName and typeName not in getRowTypes(row):
+            return False
+
+        words = set(WORD_PATTERN.findall((text or "").lower()))
+
+        return not words or words <= getRowWords(row)
+
+# ========================================================================================
+
+def _contains(sequences: list, sequence: int) -> bool:
+    position = bisect.bisect_left(sequences, sequence)
+    return position < len(sequences) and sequences[position] == sequence
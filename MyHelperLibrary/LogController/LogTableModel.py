@@ -0,0 +1,176 @@
+import bisect
+
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, Signal
+from PySide6.QtGui import QColor
+
+from LogBuffer import LogBuffer
+from LogSearchIndex import LogSearchIndex, getRowTypes, WORD_PATTERN
+
+
+
+class LogTableModel(QAbstractTableModel):
+    """ Table model over a LogBuffer of log rows for LogView's QTableView.
+        The view only asks for the cells that are visible, so no widget is created per cell and a row
+        is only formatted to text when it is painted. Rows are appended in batches with a single insert notification per batch,
+        and rows evicted from the full buffer are removed from the view.
+        Every row is added to a LogSearchIndex, and setFilter shows only the rows that match a search, type and level.
+        Indexing formats each row once when it is appended, so searches match the displayed text
+    """
+
+    # Emitted with the type name the first time a type is logged, for the type filter
+    typeAdded = Signal(str)
+
+    LEVEL_COLORS = {"WARNING": QColor("yellow"), "ERROR": QColor("red"), "CRITICAL": QColor("red")}
+
+    def __init__(self, rows: LogBuffer, parent=None):
+        super().__init__(parent)
+
+        self.rows           = rows
+        self.columns        = 0
+        self.foreground     = QColor(1, 255, 1)
+
+        # Not named index, which would hide QAbstractItemModel.index from the view
+        self.searchIndex    = LogSearchIndex(rows.capacity)
+        self.filter         = None              # (text, typeName, level) while a filter is applied
+        self.filtered       = None              # sequence numbers of the matching rows while a filter is applied
+
+    # ========================================================================================
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+
+        return len(self.rows) if self.filtered is None else len(self.filtered)
+
+    # ========================================================================================
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.columns
+
+    # ========================================================================================
+
+    def getRow(self, rowNumber: int):
+
+        if self.filtered is None:
+            return self.rows[rowNumber]
+
+        return self.rows[self.filtered[rowNumber] - self.rows.firstSequence]
+
+    # ========================================================================================
+
+    def data(self, index, role=Qt.DisplayRole):
+
+        if role == Qt.DisplayRole:
+            row = self.getRow(index.row())
+            if index.column() < len(row):
+                return row.cellText(index.column())
+
+        elif role == Qt.ForegroundRole:
+            return self.LEVEL_COLORS.get(self.getRow(index.row()).level, self.foreground)
+
+        return None
+
+    # ========================================================================================
+
+    def appendRows(self, rows: list):
+        """ Appends a batch of LogRows to the buffer. Rows can have different lengths,
+            the column count grows to fit the longest row
+        """
+        if not rows:
+            return
+
+        self._evictFor(len(rows))
+
+        width = max(len(row) for row in rows)
+
+        if width > self.columns:
+            self.beginInsertColumns(QModelIndex(), self.columns, width - 1)
+            self.columns = width
+            self.endInsertColumns()
+
+        # Rows beyond the capacity go straight to the buffer's spill file
+        kept        = rows[-self.rows.capacity:]
+        firstNew    = self.rows.firstSequence + len(self.rows) + len(rows) - len(kept)
+        matching    = []
+
+        for sequence, row in enumerate(kept, firstNew):
+            self._indexRow(sequence, row)
+
+            if self.filter and self.searchIndex.rowMatches(row, *self.filter):
+                matching.append(sequence)
+
+        if self.filtered is None:
+            first = len(self.rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(kept) - 1)
+            self.rows.extend(rows)
+            self.endInsertRows()
+
+        else:
+            self.rows.extend(rows)
+
+            if matching:
+                first = len(self.filtered)
+                self.beginInsertRows(QModelIndex(), first, first + len(matching) - 1)
+                self.filtered.extend(matching)
+                self.endInsertRows()
+
+        # Rows that went straight to the spill file are evicted, so the index's live rows are the buffer's
+        if self.searchIndex.firstSequence < self.rows.firstSequence:
+            self.searchIndex.evictBefore(self.rows.firstSequence)
+
+    # ========================================================================================
+
+    def _evictFor(self, newRowCount: int):
+        """ Evicts the rows the buffer has to drop to fit the new rows, and removes them from the view
+        """
+        evictCount = min(len(self.rows), max(0, len(self.rows) + newRowCount - self.rows.capacity))
+
+        if not evictCount:
+            return
+
+        newFirstSequence = self.rows.firstSequence + evictCount
+
+        if self.filtered is None:
+            self.beginRemoveRows(QModelIndex(), 0, evictCount - 1)
+            self.rows.evict(evictCount)
+            self.endRemoveRows()
+
+        else:
+            self.rows.evict(evictCount)
+            removed = bisect.bisect_left(self.filtered, newFirstSequence)
+
+            if removed:
+                self.beginRemoveRows(QModelIndex(), 0, removed - 1)
+                del self.filtered[:removed]
+                self.endRemoveRows()
+
+        self.searchIndex.evictBefore(newFirstSequence)
+
+    # ========================================================================================
+
+    def _indexRow(self, sequence: int, row):
+
+        for typeName in getRowTypes(row):
+            if typeName not in self.searchIndex.types:
+                self.typeAdded.emit(typeName)
+
+        self.searchIndex.addRow(sequence, row)
+
+    # ========================================================================================
+
+    def setFilter(self, text: str=None, typeName: str=None, level: str=None):
+        """ Shows only the rows containing every word of the text, with the type and level. Pass nothing to show every row.
+            Only the words of the text count, so text without any, such as punctuation, does not filter
+        """
+        text = " ".join(WORD_PATTERN.findall(text or "")) or None
+
+        self.beginResetModel()
+
+        if text or typeName or level:
+            self.filter     = (text, typeName, level)
+            self.filtered   = self.searchIndex.search(text, typeName, level)
+        else:
+            self.filter     = None
+            self.filtered   = None
+
+        self.endResetModel()
@@ -1,7 +1,9 @@
 from icecream import ic
-from PySide6.QtWidgets import QWidget, QStatusBar
-from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QWidget, QStatusBar, QTableView, QHeaderView, QAbstractItemView, QComboBox
+from PySide6.QtCore import QTimer
+from MyHelperLibrary.Helpers.HelperMethods import createLayoutFrame, createWidget
 from UiViews.UiLogWindow import Ui_LogWindow
+from LogTableModel import LogTableModel
 
 
 
@@ -16,27 +18,105 @@ class LogView(QWidget):
         self.window.setupUi(self)
         self.setStyleSheet(self.setStyle())       
 
-        self.window.TextGridFrame.layout().setAlignment(Qt.AlignTop)
+        self.createFilterBar()
+        self.createTableView()
 
         # statusbar
         self.logController.setStatusBar(QStatusBar(self))  
 
 
 
+    # ========================================================================================
+
+    """ Search box and type / level filters above the table. The search runs against the model's index, 
+        a short moment after typing stops """
+
+    def createFilterBar(self):
+
+        self.filterFrame    = createLayoutFrame(objectName="filterFrame", spacing=10, margins=(0,0,0,10))
+        self.searchEdit     = createWidget("lineEdit", objectName="searchEdit", toolTip="Rows containing every word")
+        self.searchEdit.setPlaceholderText("Search")
+
+        self.typeFilter     = QComboBox(objectName="typeFilter")
+        self.typeFilter.addItem("All types")
+
+        self.levelFilter    = QComboBox(objectName="levelFilter")
+        self.levelFilter.addItems(["All levels", "DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"])
+
+        self.filterFrame.layout().addWidget(self.searchEdit)
+        self.filterFrame.layout().addWidget(self.typeFilter)
+        self.filterFrame.layout().addWidget(self.levelFilter)
+        self.window.verticalLayout_2.addWidget(self.filterFrame)
+
+        self.searchTimer = QTimer(self)
+        self.searchTimer.setSingleShot(True)
+        self.searchTimer.setInterval(150)
+        self.searchTimer.timeout.connect(self.applyFilter)
+
+        self.searchEdit.textChanged.connect(self.searchTimer.start)
+        self.typeFilter.currentIndexChanged.connect(self.applyFilter)
+        self.levelFilter.currentIndexChanged.connect(self.applyFilter)
+
+    # ========================================================================================
+
+    def applyFilter(self):
+
+        typeName    = self.typeFilter.currentText() if self.typeFilter.currentIndex() > 0 else None
+        level       = self.levelFilter.currentText() if self.levelFilter.currentIndex() > 0 else None
+
+        self.model.setFilter(self.searchEdit.text().strip(), typeName, level)
+        self.logController.statusBar().showMessage(f"{self.model.rowCount()} of {len(self.model.rows)} rows")
+
+    # ========================================================================================
+
+    def addTypeFilter(self, typeName: str):
+        if self.typeFilter.findText(typeName) == -1:
+            self.typeFilter.addItem(typeName)
+
+    # ========================================================================================
+
+    """ The rows are shown in a table view over a LogTableModel, which only paints the visible rows. 
+        It replaces the grid of labels in the scroll area from the .ui file """
+
+    def createTableView(self):
+
+        self.model      = LogTableModel(self.logController.logData, self)
+        self.tableView  = QTableView(self.window.MainFrame, objectName="logTable")
+        self.tableView.setModel(self.model)
+        self.model.typeAdded.connect(self.addTypeFilter)
+
+        self.tableView.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tableView.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tableView.setWordWrap(False)
+        self.tableView.horizontalHeader().hide()
+        self.tableView.verticalHeader().hide()
+
+        # Fixed sizes so the view never measures the contents of every row
+        self.tableView.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.tableView.verticalHeader().setDefaultSectionSize(36)
+        self.tableView.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.tableView.horizontalHeader().setDefaultSectionSize(250)
+
+        self.window.scrollArea.hide()
+        self.window.verticalLayout_2.addWidget(self.tableView)
+
+    # ========================================================================================
+
     def setStyle(self):
 
         return """
-                    QLabel {
+                    #logTable {
                         font-size: 12pt;
                         color: #fcfcfc;
+                        background-color: black;
+                        gridline-color: black;
+                    }
+
+                    #logTable::item {
                         padding: 8px;
                         background-color: purple;
+                        border: 5px solid black;
                     }
-
-
-                    #scrollAreaWidgetContents {
-                        background-color: black;
-                    } 
                 """
         
 
@@ -1,16 +1,74 @@
 import logging
+import logging.handlers
 import colorlog
 import sys 
 import time
 import os
 import io
 import glob
+import queue
+import atexit
+import threading
+import gzip
+import importlib.util
+import shutil
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from StructuredLog import JSONLinesFormatter, BinaryRecordFormatter
 
 # ========================================================================================
 
-def setupLogger(obj, programName, logLevel=None):
+_asyncPipeline = None
+
+# Process-wide registry of the handlers created by the first setupLogger call, and the logger for each program name
+_sharedHandlers = {}
+_programLoggers = {}
+_registryLock   = threading.Lock()
+
+_LEVEL_NAMES = {"DEBUG": logging.DEBUG, "INFO": logging.INFO, "WARNING": logging.WARNING, "WARN": logging.WARNING, 
+                "ERROR": logging.ERROR, "CRITICAL": logging.CRITICAL, "FATAL": logging.CRITICAL}
+
+# ========================================================================================
+
+def setupLogger(obj, programName, logLevel=None, asyncMode: bool=False, queueSize: int=10000, backpressure: str="block",
+                maxFiles: int=10, maxBytes: int=0, rotateInterval: float=0, compression: str=None, maxTotalBytes: int=0, logFormat: str="text"):
+    """
+        Setup the root logger for any object.
+        The handlers and formatters are created by the first call in the process and shared from then on, 
+        so the settings below only take effect on that first call. Every object gets its own child logger of the program logger.
+        With asyncMode the console and file handlers run on a background writer thread, fed through a bounded queue,
+        so logging calls made on the GUI thread never wait on stdout or the disk.
+        @queueSize:     the most records that can be waiting for the writer thread
+        @backpressure:  what happens when the queue is full. "block", "dropOldest" or "dropNewest"
+        @logFormat:     the format of the log file. "text", "jsonl" for JSON lines, or "binary" for length-prefixed binary records.
+                        The structured formats can be queried with StructuredLog.StructuredLogReader
+        The remaining arguments set the rotation of the log files, see TimestampRotatingFileHandler
     """
-        Setup the root logger for any object
+    programLogger = _programLoggers.get(programName)
+
+    if programLogger is None:
+        with _registryLock:
+            if not _sharedHandlers:
+                _createSharedHandlers(programName, logLevel, asyncMode, queueSize, backpressure, logFormat,
+                                      {"maxFiles": maxFiles, "maxBytes": maxBytes, "rotateInterval": rotateInterval, 
+                                       "compression": compression, "maxTotalBytes": maxTotalBytes})
+
+            programLogger = _programLoggers.setdefault(programName, logging.getLogger(programName))
+
+    obj.logger      = programLogger.getChild(obj.__class__.__name__)
+    obj.debug       = logging.DEBUG
+    obj.info        = logging.INFO
+    obj.warning     = logging.WARNING
+    obj.error       = logging.ERROR
+    obj.critical    = logging.CRITICAL
+
+    obj.log = _log_method.__get__(obj, obj.__class__)
+
+# ========================================================================================
+
+def _createSharedHandlers(programName, logLevel, asyncMode, queueSize, backpressure, logFormat, rotation):
+    """ Creates the formatters and the console and file handlers once per process, and attaches them to the root logger
     """
     logDirectory = "Logs"
     os.makedirs(logDirectory, exist_ok=True)
@@ -40,68 +98,420 @@ def setupLogger(obj, programName, logLevel=None):
     # Create plain formatter for file
     plain_formatter = logging.Formatter('%(asctime)s - %(levelname)s: %(message)s')
     
-    # Console handler with colors
+    # Console handler with colors. 
+    # The wrapper is kept in the registry, as closing a discarded wrapper would also close sys.stdout
     utf8_stdout     = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
     console_handler = logging.StreamHandler(utf8_stdout)
     console_handler.setFormatter(colored_formatter)
     
     # File handler without colors
-    file_handler = TimestampRotatingFileHandler(logDirectory, programName, maxFiles=10)
+    if logFormat == "text":
+        file_handler = TimestampRotatingFileHandler(logDirectory, programName, **rotation)
+        file_handler.setFormatter(plain_formatter)
+
+    elif logFormat == "jsonl":
+        file_handler = TimestampRotatingFileHandler(logDirectory, programName, extension=".jsonl", **rotation)
+        file_handler.setFormatter(JSONLinesFormatter())
 
-    file_handler.setFormatter(plain_formatter)
+    elif logFormat == "binary":
+        file_handler = BinaryRotatingFileHandler(logDirectory, programName, **rotation)
+        file_handler.setFormatter(BinaryRecordFormatter())
+
+    else:
+        raise ValueError(f"Invalid log format '{logFormat}'. Must be one of ('text', 'jsonl', 'binary')")
     
+    handlers = [console_handler, file_handler]
+
+    # Hand both handlers to the writer thread and log through the queue instead
+    if asyncMode:
+        handlers = [startAsyncLogging(handlers, queueSize, backpressure)]
+
     # Configure logging with both handlers
     logging.basicConfig(
         level=numeric_level,
-        handlers=[console_handler, file_handler]
+        handlers=handlers
     )
 
-    logger_name     = obj.__class__.__name__
-    obj.logger      = logging.getLogger(logger_name)
-    obj.debug       = "debug"
-    obj.info        = "info"
-    obj.warning     = "warning"
-    obj.error       = "error"
-
-    obj.log = _log_method.__get__(obj, obj.__class__)
+    _sharedHandlers.update({"stdout": utf8_stdout, "console": console_handler, "file": file_handler, "root": handlers})
 
 # ========================================================================================
 
-def _log_method(self, level: str, message: str):
+def resetLogger():
+    """ Removes the shared handlers from the root logger and closes them, so the next setupLogger call configures logging again
+    """
+    with _registryLock:
+        stopAsyncLogging()
+
+        rootLogger = logging.getLogger()
+        for handler in _sharedHandlers.get("root", []):
+            rootLogger.removeHandler(handler)
+
+        for name in ("console", "file"):
+            if name in _sharedHandlers:
+                _sharedHandlers[name].close()
+
+        if "stdout" in _sharedHandlers:
+            _sharedHandlers["stdout"].flush()
+            _sharedHandlers["stdout"].detach()       # Leave sys.stdout open
+
+        _sharedHandlers.clear()
+        _programLoggers.clear()
 
+# ========================================================================================
+
+def _log_method(self, level, message, *args):
+    """ Logs the message at the level. Use the pre-resolved levels (self.debug, self.info, ...), level names are still accepted.
+        The message is only built when the level is enabled: pass a callable that returns the message, 
+        or a %-style format string with its args, e.g. self.log(self.debug, "Loaded %d rows", len(rows))
+    """
     # No logs are generated for empty levels allowing the logs to be turned off
     if not level:
         return
 
-    level = level.upper()
+    if level.__class__ is not int:
+        level = _resolveLevel(self.logger, level)
 
-    if not hasattr(logging, level):
-        self.logger.warning(f"Warning: Invalid log level '{level}'. Defaulting to debug")
+    if not self.logger.isEnabledFor(level):
+        return
 
-    numeric_level = getattr(logging, level, logging.DEBUG)
+    if callable(message):
+        message = message()
         
-    self.logger.log(numeric_level, message)
+    self.logger.log(level, message, *args)
+
+# ========================================================================================
+
+def _resolveLevel(logger, level: str) -> int:
+
+    numeric_level = _LEVEL_NAMES.get(level.upper())
+
+    if numeric_level is None:
+        logger.warning(f"Warning: Invalid log level '{level}'. Defaulting to debug")
+        return logging.DEBUG
+
+    return numeric_level
+
+# ========================================================================================
+
+def startAsyncLogging(handlers: list, queueSize: int=10000, backpressure: str="block"):
+    """ Starts the background writer thread for the given handlers and returns the queue handler that feeds it.
+        Only one pipeline runs per process, later calls return the existing queue handler.
+        The queue is drained and the handlers flushed when the program exits
+    """
+    global _asyncPipeline
+
+    if _asyncPipeline:
+        return _asyncPipeline[0]
+
+    queueHandler = AsyncQueueHandler(queueSize, backpressure)
+    listener     = AsyncQueueListener(queueHandler.queue, *handlers, respect_handler_level=True)
+    listener.start()
+
+    _asyncPipeline = (queueHandler, listener)
+    atexit.register(stopAsyncLogging)
+
+    return queueHandler
+
+# ========================================================================================
+
+def stopAsyncLogging():
+    """ Writes out every record still in the queue, then stops the writer thread and flushes its handlers
+    """
+    global _asyncPipeline
+
+    if not _asyncPipeline:
+        return
+
+    queueHandler, listener = _asyncPipeline
+    _asyncPipeline = None
+
+    listener.stop()
+
+    for handler in listener.handlers:
+        handler.flush()
+
+# ========================================================================================
+
+def getAsyncLoggingStats() -> dict:
+    """ Current queue depth and the number of records dropped by the backpressure policy
+    """
+    if not _asyncPipeline:
+        return {"queued": 0, "dropped": 0}
+
+    queueHandler = _asyncPipeline[0]
+
+    return {"queued": queueHandler.queue.qsize(), "dropped": queueHandler.droppedRecords}
+
+# ========================================================================================
+
+class AsyncQueueHandler(logging.handlers.QueueHandler):
+    """ Queue handler with a bounded queue. When the queue is full the backpressure policy decides what happens:
+        block:      the logging call waits for the writer thread to make room
+        dropOldest: the oldest waiting record is discarded to make room for the new one
+        dropNewest: the new record is discarded
+    """
+    BACKPRESSURE_POLICIES = ("block", "dropOldest", "dropNewest")
+
+    def __init__(self, queueSize: int=10000, backpressure: str="block"):
+
+        if backpressure not in self.BACKPRESSURE_POLICIES:
+            raise ValueError(f"Invalid backpressure policy '{backpressure}'. Must be one of {self.BACKPRESSURE_POLICIES}")
+
+        super().__init__(queue.Queue(maxsize=queueSize))
+
+        # Only merge the message arguments here, the real formatting happens on the writer thread
+        self.setFormatter(logging.Formatter("%(message)s"))
+
+        self.backpressure   = backpressure
+        self.droppedRecords = 0
+        self._dropLock      = threading.Lock()
+
+    # ---------------
+
+    def enqueue(self, record):
+
+        if self.backpressure == "block":
+            self.queue.put(record)
+            return
+
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+
+        if self.backpressure == "dropOldest":
+            try:
+                self.queue.get_nowait()
+                self.queue.task_done()
+                self._countDropped()
+            except queue.Empty:
+                pass
+
+            try:
+                self.queue.put_nowait(record)
+                return
+            except queue.Full:
+                pass                    # Another thread took the free slot, so this record is dropped as well
+
+        self._countDropped()
+
+    # ---------------
+
+    def _countDropped(self):
+        with self._dropLock:
+            self.droppedRecords += 1
+
+# ========================================================================================
+
+class AsyncQueueListener(logging.handlers.QueueListener):
+    """ Queue listener that waits for room when stopping, so the stop sentinel is never lost on a full queue
+    """
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
 
 # ========================================================================================
 
 class TimestampRotatingFileHandler(logging.FileHandler):
     """File handler that keeps only the N most recent log files. 
-        Ensures that the Logger doesn't write infinite log files
+        Ensures that the Logger doesn't write infinite log files.
+        A new file is also started during the run once the current one reaches maxBytes, or every rotateInterval seconds.
+        Finished files are compressed ("gzip" or "zstd") and old files removed on a background thread, 
+        keeping at most maxFiles files and, if set, at most maxTotalBytes on disk
     """
-    def __init__(self, logDirectory, programName: str, maxFiles: int=10):
+    COMPRESSION_EXTENSIONS  = {"gzip": ".gz", "zstd": ".zst"}
+    binary                  = False
+
+    def __init__(self, logDirectory, programName: str, maxFiles: int=10, maxBytes: int=0, rotateInterval: float=0, compression: str=None, maxTotalBytes: int=0, 
+                 extension: str=".log"):
+
+        if compression and compression not in self.COMPRESSION_EXTENSIONS:
+            raise ValueError(f"Invalid compression '{compression}'. Must be one of {tuple(self.COMPRESSION_EXTENSIONS)}")
+
+        # Fail now rather than on the first rotation if zstandard isn't installed
+        if compression == "zstd" and importlib.util.find_spec("zstandard") is None:
+            raise ImportError("zstd compression needs the zstandard package: pip install zstandard")
+
+        self.filepath       = os.path.join(logDirectory, programName)
+        self.extension      = extension
+        self.fileExtensions = (extension, *(extension + compressed for compressed in self.COMPRESSION_EXTENSIONS.values()))
+        self.maxFiles       = maxFiles
+        self.maxBytes       = maxBytes
+        self.rotateInterval = rotateInterval
+        self.compression    = compression
+        self.maxTotalBytes  = maxTotalBytes
+
+        self._rotationWorker    = None
+        self._cleanupLock       = threading.Lock()
+        self._fileTimestamp     = None
+        self._fileSuffix        = 0
+
+        self._cleanup_old_logs()  # Clean before creating new one
+        if self.binary:
+            super().__init__(self._newLogFileName(), mode='ab')
+        else:
+            super().__init__(self._newLogFileName(), encoding='utf-8')
 
-        filepath = os.path.join(logDirectory, programName)
-        self._cleanup_old_logs(filepath, maxFiles)  # Clean before creating new one
-        super().__init__(f'{filepath}_{int(time.time())}.log', encoding='utf-8')
+        self._rolloverAt = time.time() + rotateInterval if rotateInterval else None
 
     # ---------------
 
-    def _cleanup_old_logs(self, filepath: str, maxFiles: int):
-        logFiles   = sorted(glob.glob(f'{filepath}_*.log'))  # Sorted by timestamp in name (oldest first)
-        
-        while len(logFiles) >= maxFiles:
-            oldest = logFiles.pop(0)
-            os.remove(oldest)
+    def emit(self, record):
+
+        if self._rolloverAt and record.created >= self._rolloverAt:
+            self.doRollover()
+
+        super().emit(record)
+
+        # The stream is flushed after every record so tell() is the size of the file
+        if self.maxBytes and self.stream and self.stream.tell() >= self.maxBytes:
+            self.doRollover()
+
+    # ---------------
+
+    def doRollover(self):
+        """ Closes the current file and starts a new one. Compression and cleanup of the finished file 
+            are handed to the background worker so the logging call is never held up
+        """
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+
+        finishedFile        = self.baseFilename
+        self.baseFilename   = os.path.abspath(self._newLogFileName())
+
+        if not self.delay:
+            self.stream = self._open()
+
+        if self.rotateInterval:
+            self._rolloverAt = time.time() + self.rotateInterval
+
+        if not self._rotationWorker:
+            self._rotationWorker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="LogRotation")
+
+        self._rotationWorker.submit(self._finishLogFile, finishedFile)
+
+    # ---------------
+
+    def close(self):
+        super().close()
+
+        # Let any compression that is still running complete
+        if self._rotationWorker:
+            self._rotationWorker.shutdown(wait=True)
+            self._rotationWorker = None
+
+    # ---------------
+
+    def _newLogFileName(self):
+        timestamp = int(time.time())
+
+        # Several rotations can happen within the same second, so they are numbered in order.
+        # The count never goes back down, as an earlier number may already have been removed by cleanup
+        if timestamp != self._fileTimestamp:
+            self._fileTimestamp = timestamp
+            self._fileSuffix    = 0
+
+        while True:
+            fileName = f'{self.filepath}_{timestamp}' if not self._fileSuffix else f'{self.filepath}_{timestamp}_{self._fileSuffix:03d}'
+            self._fileSuffix += 1
+
+            if not any(os.path.exists(fileName + extension) for extension in self.fileExtensions):
+                return fileName + self.extension
+
+    # ---------------
+
+    def _finishLogFile(self, filePath: str):
+        try:
+            if self.compression:
+                self._compressLogFile(filePath)
+
+        except FileNotFoundError:
+            pass        # Removed by the retention limits before it could be compressed
+
+        except OSError:
+            if logging.raiseExceptions:
+                traceback.print_exc(file=sys.stderr)
+
+        self._cleanup_old_logs()
+
+    # ---------------
+
+    def _compressLogFile(self, filePath: str):
+        """ Streams the file into its compressed copy in chunks, then removes the original
+        """
+        compressedPath  = filePath + self.COMPRESSION_EXTENSIONS[self.compression]
+        partialPath     = compressedPath + ".part"
+
+        with open(filePath, 'rb') as source:
+            if self.compression == "gzip":
+                with gzip.open(partialPath, 'wb') as destination:
+                    shutil.copyfileobj(source, destination, 1024 * 1024)
+
+            elif self.compression == "zstd":
+                import zstandard
+
+                with open(partialPath, 'wb') as destination:
+                    zstandard.ZstdCompressor().copy_stream(source, destination)
+
+        os.replace(partialPath, compressedPath)
+        self._removeLogFile(filePath)
+
+    # ---------------
+
+    def _cleanup_old_logs(self):
+        """ Removes the oldest files, never the one currently being written, 
+            until the file count and total size are within their limits
+        """
+        with self._cleanupLock:
+            currentFile = getattr(self, "baseFilename", None)
+            logFiles    = sorted(f for f in glob.glob(f'{self.filepath}_*{self.extension}*') if f.endswith(self.fileExtensions))  # Sorted by timestamp in name (oldest first)
+            oldFiles    = [f for f in logFiles if os.path.abspath(f) != currentFile]
+
+            # Leave room for the current file within maxFiles
+            while oldFiles and len(oldFiles) >= self.maxFiles:
+                self._removeLogFile(oldFiles.pop(0))
+
+            if self.maxTotalBytes:
+                sizes       = {f: self._fileSize(f) for f in logFiles}
+                totalBytes  = sum(sizes.values())
+
+                while oldFiles and totalBytes > self.maxTotalBytes:
+                    oldest      = oldFiles.pop(0)
+                    totalBytes -= sizes[oldest]
+                    self._removeLogFile(oldest)
+
+    # ---------------
+
+    @staticmethod
+    def _fileSize(filePath: str) -> int:
+        try:
+            return os.path.getsize(filePath)
+        except OSError:
+            return 0
+
+    # ---------------
+
+    @staticmethod
+    def _removeLogFile(filePath: str):
+        # Also remove the sidecar index a StructuredLogReader may have left next to the file
+        for path in (filePath, f"{filePath}.idx"):
+            try:
+                os.remove(path)
+            except OSError:
+                pass        # Already removed, or still open in another process
+
+
+# ========================================================================================
+
+class BinaryRotatingFileHandler(TimestampRotatingFileHandler):
+    """ Rotating file handler for length-prefixed binary records. The formatter must return bytes, e.g. BinaryRecordFormatter
+    """
+    binary      = True
+    terminator  = b""
+
+    def __init__(self, logDirectory, programName: str, extension: str=".logb", **rotation):
+        super().__init__(logDirectory, programName, extension=extension, **rotation)
 
 
 # ========================================================================================
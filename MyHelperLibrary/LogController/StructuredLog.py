@@ -0,0 +1,317 @@
+import logging
+import json
+import os
+import struct
+import bisect
+from array import array
+
+# ========================================================================================
+
+""" Structured log records, written either as JSON lines (.jsonl) or as compact length-prefixed binary records (.logb).
+    Each record holds the timestamp, level, logger name, message and any extra fields passed to the logging call.
+
+    Binary record layout (little endian):
+        uint32  length of the rest of the record
+        float64 timestamp
+        uint8   level number
+        uint16  logger name length
+        uint32  message length
+        bytes   logger name (utf-8), message (utf-8), then the extra fields as JSON (utf-8, empty if there are none) """
+
+BINARY_HEADER       = struct.Struct("<IdBHI")
+LENGTH_PREFIX       = struct.Struct("<I")
+
+# Attributes every LogRecord has, anything else on a record came from the extra argument
+STANDARD_RECORD_ATTRIBUTES = frozenset(logging.LogRecord("", 0, "", 0, "", None, None).__dict__) | {"message", "asctime"}
+
+# ========================================================================================
+
+def getRecordExtras(record: logging.LogRecord) -> dict:
+    """ Returns the extra fields that were attached to the record by the logging call
+    """
+    return {key: value for key, value in record.__dict__.items() if key not in STANDARD_RECORD_ATTRIBUTES}
+
+# ========================================================================================
+
+def _getRecordMessage(record: logging.LogRecord, formatter: logging.Formatter) -> str:
+    message = record.getMessage()
+
+    if record.exc_info and not record.exc_text:
+        record.exc_text = formatter.formatException(record.exc_info)
+
+    if record.exc_text:
+        message = f"{message}\n{record.exc_text}"
+
+    return message
+
+# ========================================================================================
+
+class JSONLinesFormatter(logging.Formatter):
+    """ Formats each record as a single line JSON object
+    """
+    def format(self, record):
+
+        entry = {
+            "time"      : record.created,
+            "level"     : record.levelname,
+            "levelno"   : record.levelno,
+            "logger"    : record.name,
+            "message"   : _getRecordMessage(record, self),
+        }
+
+        extras = getRecordExtras(record)
+        if extras:
+            entry["extra"] = extras
+
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+# ========================================================================================
+
+class BinaryRecordFormatter(logging.Formatter):
+    """ Formats each record as a length-prefixed binary record. Returns bytes, so it must be used with a binary file handler
+    """
+    def format(self, record):
+
+        name    = record.name.encode("utf-8")
+        message = _getRecordMessage(record, self).encode("utf-8")
+        extras  = getRecordExtras(record)
+        extras  = json.dumps(extras, default=str, ensure_ascii=False).encode("utf-8") if extras else b""
+        length  = BINARY_HEADER.size - LENGTH_PREFIX.size + len(name) + len(message) + len(extras)
+
+        return BINARY_HEADER.pack(length, record.created, record.levelno, len(name), len(message)) + name + message + extras
+
+# ========================================================================================
+
+def decodeBinaryRecord(data: bytes) -> dict:
+    """ Decodes one complete binary record, including its length prefix, into the same fields as a JSON line
+    """
+    _, created, levelno, nameLength, messageLength = BINARY_HEADER.unpack_from(data)
+
+    start   = BINARY_HEADER.size
+    name    = data[start : start + nameLength].decode("utf-8")
+    start  += nameLength
+    message = data[start : start + messageLength].decode("utf-8")
+    start  += messageLength
+
+    entry = {
+        "time"      : created,
+        "level"     : logging.getLevelName(levelno),
+        "levelno"   : levelno,
+        "logger"    : name,
+        "message"   : message,
+    }
+
+    if start < len(data):
+        entry["extra"] = json.loads(data[start:])
+
+    return entry
+
+# ========================================================================================
+
+class StructuredLogReader():
+    """ Reads a .jsonl or .logb log file through a sidecar index (<file>.idx) of each record's offset, time, level and logger.
+        Queries are answered from the index and only the matching records are read from the file.
+        The index is brought up to date with anything appended since it was last saved when the reader is created,
+        or when updateIndex is called. Records are expected to be in time order, as they are when written by one process
+    """
+    INDEX_MAGIC     = b"LOGIDX1\n"
+    INDEX_HEADER    = struct.Struct("<8sQQQ")       # magic, bytes of the log that are indexed, record count, logger names length
+
+    def __init__(self, filePath: str):
+
+        self.filePath   = filePath
+        self.indexPath  = f"{filePath}.idx"
+        self.binary     = filePath.endswith(".logb")
+
+        self._resetIndex()
+        self._loadIndex()
+        self.updateIndex()
+
+    # ---------------
+
+    def __len__(self):
+        return len(self._offsets)
+
+    # ---------------
+
+    def _resetIndex(self):
+        self._offsets       = array("Q")
+        self._times         = array("d")
+        self._levels        = array("B")
+        self._loggers       = array("H")
+        self._loggerNames   = []
+        self._loggerIds     = {}
+        self._indexedBytes  = 0
+
+    # ---------------
+
+    def _loadIndex(self):
+
+        if not os.path.exists(self.indexPath):
+            return
+
+        try:
+            with open(self.indexPath, "rb") as file:
+                magic, indexedBytes, count, namesLength = self.INDEX_HEADER.unpack(file.read(self.INDEX_HEADER.size))
+
+                # A log that is smaller than what was indexed has been replaced, so the index is rebuilt
+                if magic != self.INDEX_MAGIC or indexedBytes > os.path.getsize(self.filePath):
+                    return
+
+                for column in (self._offsets, self._times, self._levels, self._loggers):
+                    column.fromfile(file, count)
+
+                self._loggerNames = json.loads(file.read(namesLength))
+
+        except (OSError, EOFError, struct.error, ValueError):
+            self._resetIndex()
+            return
+
+        self._loggerIds     = {name: i for i, name in enumerate(self._loggerNames)}
+        self._indexedBytes  = indexedBytes
+
+    # ---------------
+
+    def _saveIndex(self):
+
+        names       = json.dumps(self._loggerNames).encode("utf-8")
+        partialPath = f"{self.indexPath}.part"
+
+        with open(partialPath, "wb") as file:
+            file.write(self.INDEX_HEADER.pack(self.INDEX_MAGIC, self._indexedBytes, len(self._offsets), len(names)))
+
+            for column in (self._offsets, self._times, self._levels, self._loggers):
+                column.tofile(file)
+
+            file.write(names)
+
+        os.replace(partialPath, self.indexPath)
+
+    # ---------------
+
+    def updateIndex(self):
+        """ Indexes the records appended to the log since the last update. A record that is still being written is left for the next update
+        """
+        if not os.path.exists(self.filePath) or os.path.getsize(self.filePath) == self._indexedBytes:
+            return
+
+        with open(self.filePath, "rb") as file:
+            file.seek(self._indexedBytes)
+
+            if self.binary:
+                self._indexBinaryRecords(file)
+            else:
+                self._indexJSONLines(file)
+
+        self._saveIndex()
+
+    # ---------------
+
+    def _addIndexEntry(self, offset: int, created: float, levelno: int, loggerName: str):
+
+        loggerId = self._loggerIds.get(loggerName)
+        if loggerId is None:
+            loggerId                    = len(self._loggerNames)
+            self._loggerIds[loggerName] = loggerId
+            self._loggerNames.append(loggerName)
+
+        self._offsets.append(offset)
+        self._times.append(created)
+        self._levels.append(levelno)
+        self._loggers.append(loggerId)
+
+    # ---------------
+
+    def _indexJSONLines(self, file):
+        offset = self._indexedBytes
+
+        for line in file:
+            if not line.endswith(b"\n"):
+                break
+
+            if line.strip():
+                entry = json.loads(line)
+                self._addIndexEntry(offset, entry["time"], entry["levelno"], entry["logger"])
+
+            offset += len(line)
+
+        self._indexedBytes = offset
+
+    # ---------------
+
+    def _indexBinaryRecords(self, file):
+        offset = self._indexedBytes
+
+        while True:
+            header = file.read(BINARY_HEADER.size)
+            if len(header) < BINARY_HEADER.size:
+                break
+
+            length, created, levelno, nameLength, _ = BINARY_HEADER.unpack(header)
+            rest = file.read(length - (BINARY_HEADER.size - LENGTH_PREFIX.size))
+
+            if len(rest) < length - (BINARY_HEADER.size - LENGTH_PREFIX.size):
+                break
+
+            self._addIndexEntry(offset, created, levelno, rest[:nameLength].decode("utf-8"))
+            offset += LENGTH_PREFIX.size + length
+
+        self._indexedBytes = offset
+
+    # ---------------
+
+    def query(self, level=None, minLevel=None, logger: str=None, since: float=None, until: float=None):
+        """ Yields the records that match every given filter, oldest first.
+            @level:     only this level, as a name ("ERROR") or number
+            @minLevel:  this level and above
+            @logger:    a logger name. Also matches its child loggers, and loggers whose last name component is this name,
+                        so "OrdersView" matches "MyProgram.OrdersView"
+            @since, until: a time range as epoch seconds. e.g. since=time.time() - 3600 for the last hour
+        """
+        start   = bisect.bisect_left(self._times, since) if since is not None else 0
+        end     = bisect.bisect_right(self._times, until) if until is not None else len(self._times)
+        level   = _toLevelNumber(level)
+        minLevel = _toLevelNumber(minLevel)
+
+        loggerIds = None
+        if logger is not None:
+            loggerIds = {i for i, name in enumerate(self._loggerNames)
+                         if name == logger or name.startswith(f"{logger}.") or name.endswith(f".{logger}")}
+
+        with open(self.filePath, "rb") as file:
+            for i in range(start, end):
+                if level is not None and self._levels[i] != level:
+                    continue
+                if minLevel is not None and self._levels[i] < minLevel:
+                    continue
+                if loggerIds is not None and self._loggers[i] not in loggerIds:
+                    continue
+
+                yield self._readRecord(file, self._offsets[i])
+
+    # ---------------
+
+    def _readRecord(self, file, offset: int) -> dict:
+        file.seek(offset)
+
+        if not self.binary:
+            return json.loads(file.readline())
+
+        prefix = file.read(LENGTH_PREFIX.size)
+        (length,) = LENGTH_PREFIX.unpack(prefix)
+
+        return decodeBinaryRecord(prefix + file.read(length))
+
+# ========================================================================================
+
+def _toLevelNumber(level):
+    if level is None or isinstance(level, int):
+        return level
+
+    numericLevel = logging.getLevelName(level.upper())
+    if not isinstance(numericLevel, int):
+        raise ValueError(f"Invalid log level '{level}'")
+
+    return numericLevel
+
+# ========================================================================================
@@ -0,0 +1,60 @@
+""" Per-call cost of obj.log for a disabled level, before and after lazy evaluation.
+    Run from the repository root: python benchmarks/bench_log_method.py """
+
+import logging
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "MyHelperLibrary", "LogController"))
+
+from Logger import _log_method
+
+# ========================================================================================
+
+# The obj.log implementation before lazy evaluation, kept here for comparison
+def _legacy_log_method(self, level: str, message: str):
+
+    if not level:
+        return
+
+    level = level.upper()
+
+    if not hasattr(logging, level):
+        self.logger.warning(f"Warning: Invalid log level '{level}'. Defaulting to debug")
+
+    numeric_level = getattr(logging, level, logging.DEBUG)
+
+    self.logger.log(numeric_level, message)
+
+# ========================================================================================
+
+class View():
+    def __init__(self, logMethod):
+        self.logger = logging.getLogger("BenchmarkView")
+        self.logger.setLevel(logging.INFO)          # debug is disabled
+        self.log    = logMethod.__get__(self, View)
+
+# ========================================================================================
+
+def main(number: int=1_000_000):
+
+    legacy  = View(_legacy_log_method)
+    lazy    = View(_log_method)
+    rows    = list(range(100))
+
+    cases = {
+        "before: level name, f-string message"       : lambda: legacy.log("debug", f"Loaded {len(rows)} rows: {rows[:5]}"),
+        "after:  level name, f-string message"       : lambda: lazy.log("debug", f"Loaded {len(rows)} rows: {rows[:5]}"),
+        "after:  numeric level, %-style args"        : lambda: lazy.log(logging.DEBUG, "Loaded %d rows: %s", len(rows), rows[:5]),
+        "after:  numeric level, callable message"    : lambda: lazy.log(logging.DEBUG, lambda: f"Loaded {len(rows)} rows: {rows[:5]}"),
+    }
+
+    for name, case in cases.items():
+        seconds = min(timeit.repeat(case, number=number, repeat=3))
+        print(f"{name:<45} {seconds / number * 1e9:8.1f} ns per disabled call")
+
+# ========================================================================================
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+""" Load and dump throughput of each installed serializer on 10 - 100 MB payloads of history style records.
+    Run from the repository root: python benchmarks/bench_serializers.py [sizeMB ...] """
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from MyHelperLibrary.Helpers.Serializers import SERIALIZER_FACTORIES, getSerializer
+
+# ========================================================================================
+
+def createRecord(number: int, generator: random.Random) -> dict:
+    """ One record shaped like the rows the views save: ids, text, prices, flags, dates and a small nested list
+    """
+    return {
+        "id"            : number,
+        "name"          : f"Item {number} " + "".join(generator.choices("abcdefghijklmnopqrstuvwxyz ", k=24)),
+        "category"      : generator.choice(("Food", "Transport", "Housing", "Health", "Leisure")),
+        "price"         : round(generator.uniform(0, 1000), 2),
+        "quantity"      : generator.randint(1, 50),
+        "active"        : generator.random() < 0.8,
+        "purchaseDate"  : f"2026-{generator.randint(1, 12):02d}-{generator.randint(1, 28):02d}",
+        "notes"         : None if generator.random() < 0.5 else "Paid in full, receipt filed",
+        "tags"          : generator.sample(("weekly", "monthly", "shared", "tax", "refund", "online"), k=2),
+    }
+
+# ---------------
+
+def createPayload(sizeMB: int) -> list:
+    """ Adds records until the compact JSON encoding reaches roughly sizeMB
+    """
+    generator   = random.Random(sizeMB)
+    recordSize  = len(getSerializer("json").dumps(createRecord(0, generator), compact=True)) + 1
+    count       = sizeMB * 1024 * 1024 // recordSize
+
+    return [createRecord(number, generator) for number in range(count)]
+
+# ========================================================================================
+
+def measure(function, repeat: int=3) -> float:
+    best = float("inf")
+
+    for _ in range(repeat):
+        start   = time.perf_counter()
+        function()
+        best    = min(best, time.perf_counter() - start)
+
+    return best
+
+# ---------------
+
+def main(sizes: list):
+
+    serializers = []
+    for name in SERIALIZER_FACTORIES:
+        try:
+            serializers.append(getSerializer(name))
+        except ImportError:
+            print(f"{name:<10} not installed")
+
+    for sizeMB in sizes:
+        payload = createPayload(sizeMB)
+        print(f"\n{len(payload)} records, ~{sizeMB} MB of compact JSON")
+        print(f"{'serializer':<10} {'mode':<8} {'size MB':>8} {'dump MB/s':>10} {'load MB/s':>10}")
+
+        for serializer in serializers:
+            modes = ("binary",) if serializer.binary else ("indent", "compact")
+
+            for mode in modes:
+                compact = mode != "indent"
+                encoded = serializer.dumps(payload, compact)
+                size    = len(encoded) / (1024 * 1024)
+
+                dumpSeconds = measure(lambda: serializer.dumps(payload, compact))
+                loadSeconds = measure(lambda: serializer.loads(encoded))
+
+                print(f"{serializer.name:<10} {mode:<8} {size:8.1f} {size / dumpSeconds:10.1f} {size / loadSeconds:10.1f}")
+
+# ========================================================================================
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or [10, 50, 100])
@@ -0,0 +1,79 @@
+""" Time to build a 1,000 widget form into a shown window: the createLayoutFrame / createWidget / addWidget chain against ViewBuilder.
+    Runs headless unless QT_QPA_PLATFORM is set. Run from the repository root: python benchmarks/bench_view_builder.py """
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QEvent
+from PySide6.QtWidgets import QApplication, QWidget, QVBoxLayout
+
+from MyHelperLibrary.Helpers.HelperMethods import createLayoutFrame, createWidget, addWidgets, clearLayout
+from MyHelperLibrary.Helpers.ViewBuilder import ViewBuilder
+
+ROWS = 250              # a frame, label, line edit and button per row
+
+# ========================================================================================
+
+def buildWithHelpers(layout):
+    """ The form as views build it today, each widget added to a layout that is already in the window
+    """
+    form = createLayoutFrame("v", objectName="form", spacing=2)
+    layout.addWidget(form)
+
+    for row in range(ROWS):
+        rowFrame = createLayoutFrame(objectName="formRow", margins=(0, 0, 0, 0))
+        form.layout().addWidget(rowFrame)
+
+        addWidgets(rowFrame.layout(), [
+            createWidget("label", text=f"Field {row}", objectName="fieldLabel", sizePolicy=("fixed", "fixed")),
+            createWidget("lineEdit", objectName=f"field{row}"),
+            createWidget("button", text="Clear", sizePolicy=("fixed", "fixed")),
+        ])
+
+# ---------------
+
+FORM = ViewBuilder(("frame", {"layoutType": "v", "objectName": "form", "spacing": 2, "children": [
+            ("frame", {"objectName": "formRow", "margins": (0, 0, 0, 0), "children": [
+                ("label",       {"text": f"Field {row}", "objectName": "fieldLabel", "sizePolicy": ("fixed", "fixed")}),
+                ("lineEdit",    {"name": f"field{row}", "objectName": f"field{row}"}),
+                ("button",      {"text": "Clear", "sizePolicy": ("fixed", "fixed")}),
+            ]})
+            for row in range(ROWS)]}))
+
+def buildWithViewBuilder(layout):
+    FORM.build(parentLayout=layout)
+
+# ========================================================================================
+
+def main(repeat: int=5):
+
+    app     = QApplication.instance() or QApplication([])
+    window  = QWidget()
+    layout  = QVBoxLayout(window)
+    window.resize(800, 600)
+    window.show()
+    app.processEvents()
+
+    for name, build in (("helper chain", buildWithHelpers), ("ViewBuilder", buildWithViewBuilder)):
+        times = []
+
+        for _ in range(repeat):
+            start = time.perf_counter()
+            build(layout)
+            app.processEvents()                 # layout and show the form
+            times.append(time.perf_counter() - start)
+
+            clearLayout(layout)
+            app.processEvents()
+            app.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+
+        print(f"{name:<14} {min(times) * 1000:8.1f} ms best, {sum(times) / len(times) * 1000:8.1f} ms mean for {ROWS * 4} widgets")
+
+# ========================================================================================
+
+if __name__ == "__main__":
+    main()